@@ -7,6 +7,7 @@ from app.models.water_source import WaterSource
 from app.models.user import User
 from app.api.deps import get_current_user
 from app.services.push_notifications import PushNotificationService
+from app.services.risk_rules import get_rules
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -105,7 +106,7 @@ def create_alert(
     if alert.level.lower() in ["critical", "high"]:
         try:
             # Calculate risk score from water source data
-            risk_score = calculate_risk_score(source)
+            risk_score = calculate_risk_score(source, db)
             
             PushNotificationService.send_alert_notification(
                 db=db,
@@ -181,11 +182,10 @@ def delete_alert(
     
     return None
 
-def calculate_risk_score(source: WaterSource) -> float:
-    """Calculate risk score from water source data"""
-    # Use your existing risk calculation logic
-    rainfall_score = max(0, 100 - source.rainfall) if source.rainfall else 50
-    water_level_score = max(0, 100 - source.water_level) if source.water_level else 50
-    
-    risk_score = (rainfall_score * 0.6) + (water_level_score * 0.4)
-    return min(100, max(0, risk_score))
\ No newline at end of file
+def calculate_risk_score(source: WaterSource, db: Session) -> float:
+    """Calculate risk score with the organization's risk rules"""
+    if source.rainfall is None or source.water_level is None:
+        return 50
+
+    rules = get_rules(db, source.organization_id)
+    return float(rules.score(source.rainfall, source.water_level))
\ No newline at end of file
@@ -1,37 +1,169 @@
-from fastapi import APIRouter, Depends
-from app.models.risk_history import RiskHistory
+from datetime import datetime
+from typing import Literal
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.ml.dataset import load_series
+from app.models.water_source import WaterSource
 from app.api.routes.water_sources import get_db
-from app.ml.predictor import forecast_risk
+from app.services.dashboard_builder import source_forecast
 from app.services.trends import calculate_trend
+from app.services.downsampling import METHODS
+from app.services.history_export import MEDIA_TYPES, arrow_available, export_history, export_query
+from app.services.rollups import choose_granularity, first_reading_at, load_rollups
+from app.services.trend_query import load_trends
+from app.auth.dependencies import get_current_context
 
 router = APIRouter()
 
 
-@router.get("/trends/{source_id}")
-def get_trends(source_id: int, db=Depends(get_db)):
-    history = (
-        db.query(RiskHistory)
-        .filter(RiskHistory.water_source_id == source_id)
-        .order_by(RiskHistory.created_at)
-        .all()
+def _require_source(db, source_id: int, organization_id: int):
+    """404 unless the source belongs to the caller's organization"""
+    found = (
+        db.query(WaterSource.id)
+        .filter(
+            WaterSource.id == source_id,
+            WaterSource.organization_id == organization_id
+        )
+        .first()
     )
+    if not found:
+        raise HTTPException(
+            status_code=404,
+            detail="Water source not found or access denied"
+        )
+
+
+def _downsample(timestamps, values, max_points):
+    """Indices of the points to keep: all of them, or min/max downsampled"""
+    if len(values) <= max_points:
+        return np.arange(len(values))
+    return METHODS["minmax"](timestamps.astype(np.int64), values, max_points)
+
+
+@router.get("/trends")
+def organization_trends(context=Depends(get_current_context), db=Depends(get_db)):
+    """Trend of every source in the caller's organization, one SQL query"""
+    return load_trends(db, organization_id=context["organization_id"])
+
+
+@router.get("/export")
+def export_risk_history(
+    format: Literal["csv", "ndjson", "arrow"] = "csv",
+    source_ids: list[int] | None = Query(None, alias="source_id"),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    context=Depends(get_current_context)
+):
+    """
+    Streams the organization's risk history (water_source_id, recorded_at,
+    risk_score; by source, oldest first) as CSV, NDJSON or Arrow IPC.
+    Rows are read through a server-side cursor, memory does not grow
+    with the result size.
+    """
+    if format == "arrow" and not arrow_available():
+        raise HTTPException(status_code=501, detail="Arrow export requires pyarrow")
+
+    stmt = export_query(context["organization_id"], source_ids, start, end)
+    return StreamingResponse(
+        export_history(format, stmt),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="risk_history.{format}"'}
+    )
+
+
+@router.get("/trends/{source_id}")
+def get_trends(
+    source_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    max_points: int = Query(500, ge=3, le=5000),
+    method: Literal["lttb", "minmax"] = "lttb",
+    context=Depends(get_current_context),
+    db=Depends(get_db)
+):
+    """
+    Risk history in [start, end], downsampled server-side to at most
+    `max_points` (LTTB or min/max buckets, both keep peaks).
+    The trend is computed on the raw scores.
+    """
+    _require_source(db, source_id, context["organization_id"])
+    timestamps, risks = load_series(db, source_id, since=start, until=end, dtype=np.int64)
+    total = len(risks)
+    trend = calculate_trend(risks[-3:].tolist())
+
+    idx = np.arange(total)
+    if total > max_points:
+        idx = METHODS[method](timestamps.astype(np.int64), risks, max_points)
 
-    risks = [h.risk_score for h in history]
     return {
-        "trend": calculate_trend(risks),
-        "history": risks
+        "trend": trend,
+        "history": risks[idx].tolist(),
+        "timestamps": np.datetime_as_string(timestamps[idx], unit="s").tolist(),
+        "total_points": total,
+        "downsampled": total > max_points
     }
-    
-@router.get("/forecast/{source_id}")
-def forecast(source_id: int, db=Depends(get_db)):
-    history = (
-        db.query(RiskHistory)
-        .filter(RiskHistory.water_source_id == source_id)
-        .order_by(RiskHistory.recorded_at)
-        .all()
+
+
+@router.get("/history/{source_id}")
+def get_history(
+    source_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    max_points: int = Query(500, ge=3, le=5000),
+    resolution: int | None = Query(None, ge=1, description="widest acceptable bucket, seconds"),
+    context=Depends(get_current_context),
+    db=Depends(get_db)
+):
+    """
+    Bucketed risk history (count/min/max/mean/last) for [start, end], at
+    most `max_points` buckets. Reads the finest hour/day/month rollup that
+    fits (no wider than `resolution`, if given), falling back to raw
+    readings for short ranges; either is min/max downsampled when it
+    still has too many points.
+    """
+    _require_source(db, source_id, context["organization_id"])
+    end = end or datetime.utcnow()
+    start = start or first_reading_at(db, source_id) or end
+    granularity = choose_granularity(start, end, max_points, resolution)
+
+    if granularity is None:
+        timestamps, risks = load_series(db, source_id, since=start, until=end)
+        idx = _downsample(timestamps, risks, max_points)
+        buckets = [
+            {"start": t, "count": 1, "min": r, "max": r, "mean": r, "last": r}
+            for t, r in zip(timestamps[idx].tolist(), risks[idx].tolist())
+        ]
+        return {"granularity": "raw", "start": start, "end": end, "buckets": buckets}
+
+    rollups = load_rollups(db, source_id, granularity, start, end)
+    idx = _downsample(
+        np.array([r.bucket_start for r in rollups], dtype="datetime64[us]"),
+        np.array([r.total / r.readings for r in rollups]),
+        max_points
     )
+    return {
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "buckets": [
+            {
+                "start": r.bucket_start,
+                "count": r.readings,
+                "min": r.min_score,
+                "max": r.max_score,
+                "mean": r.total / r.readings,
+                "last": r.last_score
+            }
+            for r in (rollups[i] for i in idx)
+        ]
+    }
 
-    forecast = forecast_risk(history)
+
+@router.get("/forecast/{source_id}")
+def forecast(source_id: int, db=Depends(get_db)):
+    forecast = source_forecast(db, source_id)
 
     return {
         "source_id": source_id,
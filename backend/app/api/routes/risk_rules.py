@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.auth.dependencies import get_current_context
+from app.models.risk_rule_set import RiskRuleSet
+from app.schemas.risk_rules import RiskRulesIn, RiskRulesOut
+from app.services.risk_rules import invalidate_rules
+
+router = APIRouter(prefix="/risk-rules", tags=["risk-rules"])
+
+
+@router.get("/", response_model=RiskRulesOut)
+def get_risk_rules(
+    context = Depends(get_current_context),
+    db: Session = Depends(get_db)
+):
+    """Risk thresholds of the caller's organization (defaults if never set)"""
+    org_id = context["organization_id"]
+
+    rules = (
+        db.query(RiskRuleSet)
+        .filter(RiskRuleSet.organization_id == org_id)
+        .first()
+    )
+    if not rules:
+        return RiskRulesOut(organization_id=org_id, version=0, **RiskRulesIn().dict())
+
+    return rules
+
+
+@router.put("/", response_model=RiskRulesOut)
+def update_risk_rules(
+    payload: RiskRulesIn,
+    context = Depends(get_current_context),
+    db: Session = Depends(get_db)
+):
+    """Replace the organization's risk thresholds (admin only)"""
+    if context["role"] != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+
+    alert_bins = [payload.alert_medium, payload.alert_high, payload.alert_critical]
+    status_bins = [payload.status_moderate, payload.status_high, payload.status_critical]
+    if alert_bins != sorted(alert_bins) or status_bins != sorted(status_bins):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Alert and status thresholds must be ascending"
+        )
+
+    org_id = context["organization_id"]
+    rules = (
+        db.query(RiskRuleSet)
+        .filter(RiskRuleSet.organization_id == org_id)
+        .first()
+    )
+
+    if rules:
+        rules.version += 1
+    else:
+        rules = RiskRuleSet(organization_id=org_id, version=1)
+        db.add(rules)
+
+    for field, value in payload.dict().items():
+        setattr(rules, field, value)
+
+    db.commit()
+    db.refresh(rules)
+
+    # this process sees the change now, others within RISK_RULES_CACHE_SECONDS
+    invalidate_rules(org_id)
+
+    return rules
@@ -0,0 +1,65 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import get_db
+from app.models.recalculation_run import RecalculationRun
+from app.services.run_ledger import find_interrupted_run, request_resume
+from app.api.deps import require_roles
+
+router = APIRouter(prefix="/scheduler", tags=["scheduler"])
+settings = get_settings()
+
+
+@router.get("/runs", dependencies=[Depends(require_roles("admin"))])
+def list_runs(limit: int = 20, db: Session = Depends(get_db)):
+    """Most recent recalculation runs with their stage timings, newest first"""
+    runs = (
+        db.query(RecalculationRun)
+        .order_by(RecalculationRun.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+    return [
+        {
+            "id": run.id,
+            "mode": run.mode,
+            "status": run.status,
+            "started_at": run.started_at,
+            "finished_at": run.finished_at,
+            "last_source_id": run.last_source_id,
+            "sources_processed": run.sources_processed,
+            "attempts": run.attempts,
+            "error": run.error,
+            "metrics": json.loads(run.metrics) if run.metrics else None
+        }
+        for run in runs
+    ]
+
+
+@router.post(
+    "/runs/resume",
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_roles("admin"))]
+)
+def resume_run(db: Session = Depends(get_db)):
+    """
+    Resume an interrupted recalculation run from its last checkpoint.
+    The scheduler leader (API or worker process) picks it up on its next poll.
+    """
+    run = find_interrupted_run(db, settings.recalc_resume_window_hours)
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No interrupted run to resume"
+        )
+
+    request_resume(db, run)
+
+    return {
+        "run_id": run.id,
+        "resume_after_source_id": run.last_source_id
+    }
@@ -1,10 +1,21 @@
+from datetime import datetime
+
 from fastapi import APIRouter, Depends
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
 from app.models.water_source import WaterSource
 from app.schemas.water_source import WaterSourceCreate, WaterSourceOut
-from app.services.risk_engine import calculate_risk
+from app.services.risk_engine import calculate_risk, calculate_risk_batch
+from app.services.risk_rules import get_rules
+from app.services.risk_state import (
+    advance_regression,
+    advance_rolling,
+    record_risk,
+    upsert_states
+)
 from app.models.risk_history import RiskHistory
+from app.services.rollups import record_rollups
 from app.auth.dependencies import get_current_context
 
 router = APIRouter()
@@ -17,23 +28,80 @@ def get_db():
         db.close()
 
 @router.post("/", response_model=WaterSourceOut)
-def create_water_source(payload: WaterSourceCreate, db: Session = Depends(get_db)):
-    risk_score = calculate_risk(payload.rainfall, payload.water_level)
-    source = WaterSource(**payload.dict())
+def create_water_source(
+    payload: WaterSourceCreate,
+    context = Depends(get_current_context),
+    db: Session = Depends(get_db)
+):
+    org_id = context["organization_id"]
+    rules = get_rules(db, org_id)
+
+    risk_score = calculate_risk(payload.rainfall, payload.water_level, rules)
+    source = WaterSource(**payload.dict(), organization_id=org_id)
     db.add(source)
     db.commit()
     db.refresh(source)
-    history = RiskHistory(
-        water_source_id=source.id,
-        risk_score=risk_score
-    )
-    db.add(history)
+    record_risk(db, source.id, org_id, risk_score, rules, trend="stable")
     db.commit()
 
     db.refresh(source)
 
     return source
 
+
+@router.post("/bulk", response_model=list[WaterSourceOut])
+def create_water_sources_bulk(
+    payload: list[WaterSourceCreate],
+    context = Depends(get_current_context),
+    db: Session = Depends(get_db)
+):
+    """Ingest many sources at once, scoring all of them in one vectorized pass"""
+    org_id = context["organization_id"]
+
+    rules = get_rules(db, org_id)
+    risks = calculate_risk_batch(
+        [p.rainfall for p in payload],
+        [p.water_level for p in payload],
+        rules
+    ).tolist()
+    now = datetime.utcnow()
+
+    sources = [
+        WaterSource(**p.dict(), organization_id=org_id)
+        for p in payload
+    ]
+    db.add_all(sources)
+    db.flush()
+
+    if sources:
+        history_rows = [
+            {
+                "water_source_id": source.id,
+                "organization_id": org_id,
+                "risk_score": risk,
+                "recorded_at": now
+            }
+            for source, risk in zip(sources, risks)
+        ]
+        db.execute(insert(RiskHistory), history_rows)
+        record_rollups(db, history_rows)
+        upsert_states(db, [
+            {
+                "water_source_id": source.id,
+                "organization_id": org_id,
+                "risk_score": risk,
+                "status": rules.status(risk),
+                "trend": "stable",
+                "recorded_at": now,
+                **advance_regression(None, risk).as_columns(),
+                **advance_rolling(None, risk).as_columns()
+            }
+            for source, risk in zip(sources, risks)
+        ])
+    db.commit()
+
+    return sources
+
 # @router.get("/")
 # def list_sources(org_id: int, db: Session = Depends(get_db)):
 #     sources = db.query(WaterSource).filter(WaterSource.organization_id == org_id).all()
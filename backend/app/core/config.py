@@ -9,6 +9,58 @@ class Settings(BaseSettings):
     secret_key: str = "change-me"
     access_token_expire_minutes: int = 30
 
+    # per-organization risk rules are re-read after this many seconds
+    risk_rules_cache_seconds: int = 60
+
+    # forecasts kept per source until its next reading, LRU beyond this
+    forecast_cache_size: int = 10000
+    # forecast from running regression sums kept in source_risk_states
+    # (O(1)) instead of refitting on history; decay < 1 favours recent scores
+    forecast_incremental: bool = False
+    forecast_decay: float = 1.0
+    # "artifact" forecasts with the active trained model from the registry
+    # (python -m app.scripts.train_forecast_model), "linear" refits per call
+    forecast_model: str = "linear"
+    model_artifact_dir: str = "model_artifacts"
+    model_registry_refresh_seconds: int = 60
+    # per-source rolling statistics (ring buffer of the last N scores)
+    rolling_window: int = 24
+    rolling_ewma_alpha: float = 0.3
+
+    # forecast/dashboard history lookback, pushed into SQL (None = unbounded)
+    forecast_history_limit: int | None = 500  # newest N readings
+    forecast_history_days: int | None = None  # readings from the last N days
+
+    # rows per server-side cursor fetch in /analytics/export
+    export_batch_size: int = 5000
+
+    # update_risk: blocking stages run in this many threads, bounded in-flight
+    risk_update_workers: int = 4
+    risk_update_concurrency: int = 32
+
+    # risk recalculation job
+    recalc_batch_mode: bool = True
+    recalc_history_limit: int | None = None  # last N scores, None = FORECAST_HISTORY_LIMIT
+    recalc_chunk_size: int = 1000  # sources per commit, 0 = one transaction
+    recalc_resume_window_hours: int = 24  # older interrupted runs start over
+    recalc_workers: int = 1  # > 1 shards by organization across processes
+    # only sources with new readings or an expired forecast; off by default:
+    # the job's own simulation step is what produces new readings here
+    recalc_dirty_only: bool = False
+    forecast_ttl_hours: int = 72  # clean sources are still refreshed this often
+
+    # risk-prioritised evaluation instead of one fixed 24h pass
+    adaptive_scheduling: bool = False
+    adaptive_budget_per_hour: int = 20000  # source evaluations per hour
+    adaptive_tick_seconds: int = 60
+
+    # scheduled jobs; set RUN_SCHEDULER_IN_API=false and run `python -m app.worker`
+    run_scheduler_in_api: bool = True
+    scheduler_resume_poll_seconds: int = 60
+
+    # only the holder of this DB lease runs scheduled jobs
+    scheduler_lease_ttl_seconds: int = 90
+
     class Config:
         env_file = ".env"
         case_sensitive = False
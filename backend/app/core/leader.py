@@ -0,0 +1,116 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from functools import wraps
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.scheduler_lease import SchedulerLease
+from app.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def try_acquire_lease(db: Session, name: str, holder: str, ttl_seconds: int) -> bool:
+    """
+    Renews the lease if `holder` owns it, takes it over if it expired,
+    creates it if it doesn't exist. Single conditional UPDATE, so it is
+    atomic on both SQLite and MySQL.
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+
+    result = db.execute(
+        update(SchedulerLease)
+        .where(
+            SchedulerLease.name == name,
+            or_(
+                SchedulerLease.holder == holder,
+                SchedulerLease.expires_at < now
+            )
+        )
+        .values(holder=holder, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.rowcount == 1:
+        db.commit()
+        return True
+
+    # no row yet: first one to insert wins
+    try:
+        db.add(SchedulerLease(name=name, holder=holder, expires_at=expires_at, acquired_at=now))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+
+def release_lease(db: Session, name: str, holder: str):
+    db.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+        .values(expires_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+class LeaderLease:
+    """
+    DB-backed leadership so only one process (across uvicorn workers,
+    pods, ...) runs scheduled jobs. The lease is renewed periodically;
+    if the leader dies it expires and another process takes over.
+    """
+
+    def __init__(self, name: str, ttl_seconds: int):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+
+    def renew(self) -> bool:
+        db: Session = SessionLocal()
+        try:
+            leader = try_acquire_lease(db, self.name, self.holder, self.ttl_seconds)
+        except Exception as e:
+            logger.error(f"Lease {self.name} renewal failed: {e}")
+            leader = False
+        finally:
+            db.close()
+
+        if leader != self.is_leader:
+            logger.info(
+                f"{self.holder} {'acquired' if leader else 'lost'} lease {self.name}"
+            )
+        self.is_leader = leader
+        return leader
+
+    def release(self):
+        if not self.is_leader:
+            return
+
+        db: Session = SessionLocal()
+        try:
+            release_lease(db, self.name, self.holder)
+            self.is_leader = False
+        finally:
+            db.close()
+
+    def guard(self, job):
+        """
+        Wraps a job so it only runs on the current leader
+        """
+        @wraps(job)
+        def wrapper(*args, **kwargs):
+            if not self.renew():
+                logger.debug(f"Skipping {job.__name__}: not the leader")
+                return None
+            return job(*args, **kwargs)
+
+        return wrapper
@@ -0,0 +1,73 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class RunMetrics:
+    """
+    Per-stage wall time, query count and rows written for one
+    recalculation run. Cheap enough to leave on in production.
+    """
+
+    def __init__(self):
+        self.stages = defaultdict(float)
+        self.rows_written = defaultdict(int)
+        self.queries = 0
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - started
+
+    def add_time(self, name: str, seconds: float):
+        self.stages[name] += seconds
+
+    def add_rows(self, table: str, count: int):
+        self.rows_written[table] += count
+
+    def timed_iter(self, iterable, name: str):
+        """
+        Attributes the time spent producing each item (e.g. a chunk query)
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                item = next(iterator, None)
+            if item is None:
+                return
+            yield item
+
+    def watch(self, db: Session):
+        """
+        Counts every statement executed through `db`
+        """
+        def count(orm_execute_state):
+            self.queries += 1
+
+        event.listen(db, "do_orm_execute", count)
+        return self
+
+    def merge(self, other: dict):
+        """
+        Folds in another run's as_dict() (e.g. from a shard process)
+        """
+        for name, seconds in other.get("stages", {}).items():
+            self.stages[name] += seconds
+        for table, count in other.get("rows_written", {}).items():
+            self.rows_written[table] += count
+        self.queries += other.get("queries", 0)
+
+    def as_dict(self) -> dict:
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 3),
+            "stages": {k: round(v, 4) for k, v in self.stages.items()},
+            "queries": self.queries,
+            "rows_written": dict(self.rows_written)
+        }
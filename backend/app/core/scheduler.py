@@ -1,12 +1,30 @@
+import multiprocessing
+import threading
+import time
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import wraps
+
 from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.core.database import SessionLocal
+from app.core.leader import LeaderLease
+from app.core.metrics import RunMetrics
 from app.models.water_source import WaterSource
 from app.models.risk_history import RiskHistory
 from app.models.alert import Alert
 
 from app.services.risk_engine import calculate_risk
+from app.services.risk_rules import get_rules
+from app.services.rollups import record_rollups
+from app.services.risk_state import (
+    advance_regression,
+    advance_rolling,
+    load_states,
+    upsert_states
+)
 from app.services.environment_simulator import (
     simulate_rainfall,
     simulate_water_level
@@ -17,14 +35,46 @@ from app.services.alert_engine import (
     should_trigger_alert
 )
 
-from app.ml.predictor import forecast_risk
+from app.ml.predictor import forecast_scores
+from app.services.dashboard_builder import load_history_scores
+from app.services.adaptive_scheduler import AdaptiveRiskScheduler
+from app.services.run_ledger import (
+    checkpoint,
+    find_interrupted_run,
+    finish_run,
+    is_resume_requested,
+    last_completed_run,
+    record_run,
+    start_or_resume_run
+)
+from app.services.risk_batch import (
+    iter_source_chunks,
+    recalculate_batch,
+    recalculation_due,
+    summarize
+)
+from app.core.config import get_settings
 from app.utils.logger import get_logger
 
 logger = get_logger()
+settings = get_settings()
+
+# one recalculation at a time per process (scheduled job or manual resume)
+_run_lock = threading.Lock()
+
+RECALC_INTERVAL_HOURS = 24
+# a full run counts for this share of the interval: later timers still run
+# (a roughly daily pass), earlier ones after a leader change are skipped
+RECALC_MIN_GAP_FRACTION = 0.9
+
+_scheduler = None
+_leader = None
+_adaptive = None
 
 
 def recalculate_risks():
     db: Session = SessionLocal()
+    started_at = datetime.utcnow()
 
     try:
         sources = db.query(WaterSource).all()
@@ -33,20 +83,28 @@ def recalculate_risks():
             # --- simulate environment ---
             source.rainfall = simulate_rainfall(source.rainfall)
             source.water_level = simulate_water_level(source.water_level)
+            source.needs_recalculation = False
 
             # --- calculate risk ---
+            rules = get_rules(db, source.organization_id)
             risk = calculate_risk(
                 source.rainfall,
-                source.water_level
+                source.water_level,
+                rules
             )
 
             # --- store history ---
-            db.add(RiskHistory(
-                water_source_id=source.id,
-                risk_score=risk
-            ))
+            recorded_at = datetime.utcnow()
+            history = {
+                "water_source_id": source.id,
+                "organization_id": source.organization_id,
+                "risk_score": risk,
+                "recorded_at": recorded_at
+            }
+            db.add(RiskHistory(**history))
+            record_rollups(db, [history])
 
-            logger.info(
+            logger.debug(
                 f"Source {source.id} risk recalculated: {risk}"
             )
 
@@ -54,15 +112,15 @@ def recalculate_risks():
             recent = (
                 db.query(RiskHistory.risk_score)
                 .filter(RiskHistory.water_source_id == source.id)
-                .order_by(RiskHistory.created_at.desc())
+                .order_by(RiskHistory.recorded_at.desc(), RiskHistory.id.desc())
                 .limit(5)
                 .all()
             )
-            recent_scores = [r[0] for r in recent]
+            recent_scores = [r[0] for r in reversed(recent)]
             trend = calculate_trend(recent_scores)
 
             # --- alerting ---
-            level = determine_alert_level(risk)
+            level = determine_alert_level(risk, rules)
             if level:
                 existing = (
                     db.query(Alert)
@@ -77,19 +135,28 @@ def recalculate_risks():
                 if should_trigger_alert(existing, level):
                     db.add(Alert(
                         water_source_id=source.id,
+                        organization_id=source.organization_id,
                         level=level,
                         message=f"Risk is {level.upper()} ({risk})"
                     ))
 
             # --- forecasting ---
-            history = (
-                db.query(RiskHistory)
-                .filter(RiskHistory.water_source_id == source.id)
-                .order_by(RiskHistory.created_at)
-                .all()
-            )
+            forecast = forecast_scores(load_history_scores(db, source.id), source.id)
+
+            # --- latest state ---
+            previous = load_states(db, [source.id], for_update=True).get(source.id)
+            upsert_states(db, [{
+                "water_source_id": source.id,
+                "organization_id": source.organization_id,
+                "risk_score": risk,
+                "status": rules.status(risk),
+                "trend": trend,
+                "forecast": forecast,
+                "recorded_at": recorded_at,
+                **advance_regression(previous, risk).as_columns(),
+                **advance_rolling(previous, risk).as_columns()
+            }])
 
-            forecast = forecast_risk(history)
             if forecast and forecast >= 80:
                 logger.warning(
                     f"Forecasted CRITICAL risk for source {source.id}: {forecast}"
@@ -97,6 +164,15 @@ def recalculate_risks():
 
         db.commit()
 
+        record_run(
+            db,
+            mode="legacy",
+            status="completed",
+            started_at=started_at,
+            sources_processed=len(sources),
+            metrics={}
+        )
+
     except Exception as e:
         db.rollback()
         logger.error(f"Scheduler failed: {e}")
@@ -105,7 +181,439 @@ def recalculate_risks():
         db.close()
 
 
+def _run_batch(organization_ids=None, after_id=0, on_chunk=None, metrics=None):
+    """
+    Streams sources in chunks of RECALC_CHUNK_SIZE and commits per chunk,
+    so memory stays flat and a failure only loses the current chunk.
+    Re-raises after rollback so callers (and shard workers) can report it.
+    `on_chunk(db, last_source_id, totals)` runs inside each chunk's
+    transaction, right before its commit.
+    Stage timings and query/row counts accumulate in `metrics`.
+    """
+    metrics = metrics or RunMetrics()
+    db: Session = SessionLocal()
+    metrics.watch(db)
+    totals = {"sources": 0, "history_rows": 0, "alerts": 0, "critical_forecasts": 0}
+
+    try:
+        chunks = iter_source_chunks(
+            db,
+            chunk_size=settings.recalc_chunk_size,
+            after_id=after_id,
+            organization_ids=organization_ids,
+            due_only=settings.recalc_dirty_only
+        )
+
+        for sources in metrics.timed_iter(chunks, "load"):
+            outcomes = recalculate_batch(
+                db,
+                sources,
+                history_limit=settings.recalc_history_limit,
+                forecast_ttl_hours=settings.forecast_ttl_hours,
+                metrics=metrics
+            )
+            summary = summarize(outcomes)
+
+            totals["sources"] += summary["sources"]
+            totals["history_rows"] += summary["history_rows"]
+            totals["alerts"] += summary["alerts"]
+            totals["critical_forecasts"] += len(summary["critical_forecasts"])
+
+            if on_chunk:
+                on_chunk(db, sources[-1].id, totals)
+
+            with metrics.stage("commit"):
+                db.commit()
+            db.expunge_all()
+
+            _log_summary(summary)
+            logger.info(
+                f"Recalculation progress: {totals['sources']} sources "
+                f"(last id {sources[-1].id})"
+            )
+
+        totals["metrics"] = metrics.as_dict()
+        return totals
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+def _log_summary(summary):
+    for source_id in summary["critical_forecasts"]:
+        logger.warning(f"Forecasted CRITICAL risk for source {source_id}")
+
+
+def recalculate_risks_batch():
+    """
+    Set-based variant of recalculate_risks: constant number of queries
+    per chunk, bulk inserts for history and alerts.
+    Progress is checkpointed in the run ledger; an interrupted run is
+    resumed from its last committed source id instead of starting over.
+    Returns the run totals, or None if a run is already in progress.
+    """
+    if not _run_lock.acquire(blocking=False):
+        logger.warning("Recalculation already in progress, skipping")
+        return None
+
+    db: Session = None
+
+    try:
+        db = SessionLocal()
+        run = start_or_resume_run(db, settings.recalc_resume_window_hours)
+        run_id = run.id
+        resumed_from = run.last_source_id or 0
+        already_processed = run.sources_processed or 0
+
+        if resumed_from:
+            logger.info(f"Resuming recalculation run {run_id} after source {resumed_from}")
+
+        def record_checkpoint(chunk_db, last_source_id, totals):
+            checkpoint(
+                chunk_db,
+                run_id,
+                last_source_id,
+                already_processed + totals["sources"]
+            )
+
+        metrics = RunMetrics()
+        try:
+            summary = _run_batch(
+                after_id=resumed_from,
+                on_chunk=record_checkpoint,
+                metrics=metrics
+            )
+        except Exception as e:
+            finish_run(db, run_id, "failed", str(e), metrics=metrics.as_dict())
+            logger.error(f"Scheduler failed: {e}")
+            return None
+
+        finish_run(db, run_id, "completed", metrics=summary["metrics"])
+        logger.info(
+            f"Batch recalculation done: {summary['sources']} sources, "
+            f"{summary['alerts']} alerts, {summary['metrics']['queries']} queries "
+            f"in {summary['metrics']['total_seconds']}s"
+        )
+        return summary
+
+    except Exception as e:
+        logger.error(f"Scheduler failed: {e}")
+
+    finally:
+        if db is not None:
+            db.close()
+        _run_lock.release()
+
+
+def partition_organizations(counts, shards: int):
+    """
+    Greedy bin-packing of (organization_id, source_count) pairs into
+    at most `shards` groups of roughly equal source count.
+    """
+    bins = [{"organization_ids": [], "sources": 0} for _ in range(shards)]
+
+    for org_id, count in sorted(counts, key=lambda c: c[1], reverse=True):
+        target = min(bins, key=lambda b: b["sources"])
+        target["organization_ids"].append(org_id)
+        target["sources"] += count
+
+    return [b["organization_ids"] for b in bins if b["organization_ids"]]
+
+
+def _recalculate_shard(shard: int, organization_ids):
+    """
+    Runs inside a worker process with its own engine and session
+    """
+    # a spawned process only has what this module pulled in: load the
+    # full model registry so FKs (organizations.id) resolve
+    import app.models  # noqa: F401
+
+    started = time.perf_counter()
+    summary = _run_batch(organization_ids)
+    summary["shard"] = shard
+    summary["organization_ids"] = organization_ids
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def recalculate_risks_sharded(workers: int = None):
+    """
+    Partitions sources by organization and recalculates each shard in a
+    separate process. Shards commit independently: one failing shard
+    does not roll back the others.
+    """
+    workers = workers or settings.recalc_workers
+    started = time.perf_counter()
+    started_at = datetime.utcnow()
+    metrics = RunMetrics()
+
+    db: Session = SessionLocal()
+    try:
+        stmt = (
+            select(WaterSource.organization_id, func.count(WaterSource.id))
+            .group_by(WaterSource.organization_id)
+        )
+        if settings.recalc_dirty_only:
+            stmt = stmt.where(recalculation_due(datetime.utcnow()))
+        counts = db.execute(stmt).all()
+    finally:
+        db.close()
+
+    shards = partition_organizations(counts, workers)
+    results = []
+
+    if not shards:
+        return results
+
+    # spawn: never fork the API process (threads, pooled DB connections)
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+        futures = {
+            pool.submit(_recalculate_shard, shard, org_ids): shard
+            for shard, org_ids in enumerate(shards)
+        }
+
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                logger.error(f"Shard {shard} failed: {e}")
+                continue
+
+            logger.info(
+                f"Shard {shard} done: {summary['sources']} sources, "
+                f"{summary['alerts']} alerts in {summary['seconds']}s"
+            )
+            metrics.merge(summary["metrics"])
+            results.append(summary)
+
+    db = SessionLocal()
+    try:
+        stats = metrics.as_dict()
+        stats["shards"] = [
+            {"shard": r["shard"], "sources": r["sources"], "seconds": r["seconds"]}
+            for r in results
+        ]
+        record_run(
+            db,
+            mode="sharded",
+            status="completed" if len(results) == len(shards) else "failed",
+            started_at=started_at,
+            sources_processed=sum(r["sources"] for r in results),
+            metrics=stats
+        )
+    except Exception as e:
+        logger.error(f"Could not record sharded run: {e}")
+    finally:
+        db.close()
+
+    logger.info(
+        f"Sharded recalculation done: {len(results)}/{len(shards)} shards "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return results
+
+
+def evaluate_adaptive():
+    """
+    One round of risk-prioritised evaluation (ADAPTIVE_SCHEDULING).
+    Rounds that evaluate sources, or fail, are recorded in the run ledger.
+    """
+    global _adaptive
+
+    if not _run_lock.acquire(blocking=False):
+        return None
+
+    # everything after the acquire sits inside try/finally: a failed setup
+    # must not leave the lock held (every later run would be skipped)
+    db: Session = None
+    started_at = datetime.utcnow()
+    metrics = RunMetrics()
+
+    try:
+        if _adaptive is None:
+            _adaptive = AdaptiveRiskScheduler(
+                budget_per_hour=settings.adaptive_budget_per_hour,
+                tick_seconds=settings.adaptive_tick_seconds
+            )
+
+        db = SessionLocal()
+        metrics.watch(db)
+
+        outcomes = _adaptive.tick(
+            db,
+            history_limit=settings.recalc_history_limit,
+            forecast_ttl_hours=settings.forecast_ttl_hours,
+            metrics=metrics
+        )
+        with metrics.stage("commit"):
+            db.commit()
+
+        if outcomes:
+            _log_summary(summarize(outcomes))
+            logger.info(
+                f"Adaptive evaluation: {len(outcomes)} sources, "
+                f"{len(_adaptive)} queued"
+            )
+            record_run(
+                db,
+                mode="adaptive",
+                status="completed",
+                started_at=started_at,
+                sources_processed=len(outcomes),
+                metrics=metrics.as_dict()
+            )
+        return outcomes
+
+    except Exception as e:
+        logger.error(f"Adaptive evaluation failed: {e}")
+        if db is None:
+            return None
+        db.rollback()
+        try:
+            record_run(
+                db,
+                mode="adaptive",
+                status="failed",
+                started_at=started_at,
+                sources_processed=0,
+                metrics=metrics.as_dict(),
+                error=str(e)
+            )
+        except Exception as ledger_error:
+            logger.error(f"Could not record adaptive run: {ledger_error}")
+
+    finally:
+        if db is not None:
+            db.close()
+        _run_lock.release()
+
+
+def _has_interrupted_run() -> bool:
+    db: Session = SessionLocal()
+    try:
+        return find_interrupted_run(db, settings.recalc_resume_window_hours) is not None
+    except Exception as e:
+        logger.error(f"Could not read recalculation ledger: {e}")
+        return False
+    finally:
+        db.close()
+
+
+def resume_requested_run():
+    """
+    Picks up a manual "resume now" (POST /scheduler/runs/resume) from the
+    ledger, so the trigger works whichever process hosts the scheduler.
+    """
+    db: Session = SessionLocal()
+    try:
+        requested = is_resume_requested(db)
+    finally:
+        db.close()
+
+    if requested:
+        logger.info("Manual resume requested")
+        recalculate_risks_batch()
+
+
+def skip_if_recently_run(job):
+    """
+    Every process keeps its own interval timer and the lease only decides
+    who runs, so after a leadership change the new leader's timer may fire
+    shortly after the old leader's run. Skips the job when the ledger has
+    a full run that completed and started within most of the interval.
+    """
+    @wraps(job)
+    def wrapper(*args, **kwargs):
+        since = datetime.utcnow() - timedelta(
+            hours=RECALC_INTERVAL_HOURS * RECALC_MIN_GAP_FRACTION
+        )
+        db: Session = SessionLocal()
+        try:
+            recent = last_completed_run(db, since)
+        finally:
+            db.close()
+
+        if recent is not None:
+            logger.info(
+                f"Skipping {job.__name__}: run {recent.id} ({recent.mode}) "
+                f"started at {recent.started_at}"
+            )
+            return None
+        return job(*args, **kwargs)
+
+    return wrapper
+
+
+def register_jobs(scheduler):
+    """
+    Adds all scheduled jobs to `scheduler` (API BackgroundScheduler or the
+    standalone worker's BlockingScheduler), guarded by the leader lease.
+    """
+    global _scheduler, _leader
+
+    if settings.recalc_workers > 1:
+        job = recalculate_risks_sharded
+    elif settings.recalc_batch_mode:
+        job = recalculate_risks_batch
+    else:
+        job = recalculate_risks
+
+    # every process registers jobs, only the lease holder runs them
+    _leader = LeaderLease("scheduler", settings.scheduler_lease_ttl_seconds)
+    _leader.renew()
+
+    if settings.adaptive_scheduling:
+        # replaces the fixed 24h pass: safe sources are still seen daily
+        scheduler.add_job(
+            _leader.guard(evaluate_adaptive),
+            "interval",
+            seconds=settings.adaptive_tick_seconds
+        )
+    else:
+        scheduler.add_job(
+            _leader.guard(skip_if_recently_run(job)),
+            "interval",
+            hours=RECALC_INTERVAL_HOURS
+        )
+    scheduler.add_job(
+        _leader.renew,
+        "interval",
+        seconds=max(1, settings.scheduler_lease_ttl_seconds // 3)
+    )
+    scheduler.add_job(
+        _leader.guard(resume_requested_run),
+        "interval",
+        seconds=settings.scheduler_resume_poll_seconds
+    )
+
+    # don't wait a full interval after a crash / restart mid-run
+    if job is recalculate_risks_batch and _leader.is_leader and _has_interrupted_run():
+        logger.info("Interrupted recalculation run found, resuming now")
+        scheduler.add_job(
+            _leader.guard(recalculate_risks_batch),
+            "date",
+            run_date=datetime.now()
+        )
+
+    _scheduler = scheduler
+    return scheduler
+
+
 def start_scheduler():
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(recalculate_risks, "interval", hours=24)
-    scheduler.start()
\ No newline at end of file
+    scheduler = register_jobs(BackgroundScheduler())
+    scheduler.start()
+    return scheduler
+
+
+def stop_scheduler():
+    if _scheduler and _scheduler.running:
+        _scheduler.shutdown(wait=False)
+    if _leader:
+        _leader.release()
@@ -4,10 +4,12 @@ from app.models.water_source import WaterSource
 from fastapi.middleware.cors import CORSMiddleware
 from .api.routes import water_sources
 from .utils.logger import get_logger
-from app.core.scheduler import start_scheduler
+from app.core.scheduler import start_scheduler, stop_scheduler
+from app.core.config import get_settings
+from app.services.risk_engine import start_risk_updates
 from fastapi import Request
 from .api.routes.water_sources import get_db
-from app.api.routes import water, analytics, alerts,dashboard,realtime,explanations,auth
+from app.api.routes import water, analytics, alerts,dashboard,realtime,explanations,auth,scheduler,risk_rules
 
 app = FastAPI(title="Water Risk API", version="v1")
 
@@ -32,7 +34,10 @@ app.include_router(dashboard.router, tags=["dashboard"])
 app.include_router(realtime.router)
 app.include_router(explanations.router)
 app.include_router(auth.router)
+app.include_router(scheduler.router)
+app.include_router(risk_rules.router)
 logger = get_logger()
+settings = get_settings()
 
 
 @app.get("/health")
@@ -43,8 +48,16 @@ def health_check() -> dict:
 
 @app.on_event("startup")
 def startup_event():
-    start_scheduler()
-    
+    start_risk_updates()
+    # "no-scheduler" mode: jobs run in the standalone worker (python -m app.worker)
+    if settings.run_scheduler_in_api:
+        start_scheduler()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    stop_scheduler()
+
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -58,27 +71,38 @@ def list_sources(db = Depends(get_db), limit: int = 10, offset: int = 0):
 
 @app.get("/map/sources")
 def map_sources(db = Depends(get_db)):
-    from app.models.risk_history import RiskHistory
-    from sqlalchemy import func
-    
-    sources = db.query(WaterSource).all()
-    
-    result = []
-    for source in sources:
-        latest_risk = db.query(RiskHistory.risk_score).filter(
-            RiskHistory.water_source_id == source.id
-        ).order_by(RiskHistory.recorded_at.desc()).first()
-        
-        risk_value = latest_risk[0] if latest_risk else 0
-        
-        result.append({
-            "id": source.id,
-            "name": source.name,
-            "latitude": source.latitude,
-            "longitude": source.longitude,
-            "water_level": source.water_level,
-            "rainfall": source.rainfall,
-            "risk": risk_value
-        })
-    
-    return result
\ No newline at end of file
+    from app.models.source_risk_state import SourceRiskState
+    from sqlalchemy import select
+
+    # latest risk comes from the materialized state: one query for the map
+    rows = db.execute(
+        select(
+            WaterSource.id,
+            WaterSource.name,
+            WaterSource.latitude,
+            WaterSource.longitude,
+            WaterSource.water_level,
+            WaterSource.rainfall,
+            SourceRiskState.risk_score,
+            SourceRiskState.status
+        )
+        .outerjoin(
+            SourceRiskState,
+            SourceRiskState.water_source_id == WaterSource.id
+        )
+        .order_by(WaterSource.id)
+    )
+
+    return [
+        {
+            "id": row.id,
+            "name": row.name,
+            "latitude": row.latitude,
+            "longitude": row.longitude,
+            "water_level": row.water_level,
+            "rainfall": row.rainfall,
+            "risk": row.risk_score or 0,
+            "status": row.status or "safe"
+        }
+        for row in rows
+    ]
\ No newline at end of file
@@ -0,0 +1,138 @@
+import json
+import os
+
+import numpy as np
+
+KIND = "autoregressive"
+
+
+def _lagged(scores, order):
+    """
+    Design matrix [1, y(t-order) .. y(t-1)] and targets y(t) of one series
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    windows = np.lib.stride_tricks.sliding_window_view(scores, order + 1)
+    X = np.hstack([np.ones((len(windows), 1)), windows[:, :-1]])
+    return X, windows[:, -1]
+
+
+def fit_autoregressive(series_by_source, order=3, min_samples=None):
+    """
+    Fits y(t) = b + a1*y(t-order) + .. + a_order*y(t-1) per source by least
+    squares, plus one pooled model over all sources for sources with too
+    little history (fewer than `min_samples` lagged rows, default 3*order).
+    Returns (source_ids, coefs, pooled_coef, metrics).
+    """
+    min_samples = min_samples or 3 * order
+    source_ids = []
+    coefs = []
+    pooled_X = []
+    pooled_y = []
+
+    for source_id, scores in sorted(series_by_source.items()):
+        if len(scores) <= order:
+            continue
+        X, y = _lagged(scores, order)
+        pooled_X.append(X)
+        pooled_y.append(y)
+        if len(y) >= min_samples:
+            coef, *_ = np.linalg.lstsq(X, y, rcond=None)
+            source_ids.append(source_id)
+            coefs.append(coef)
+
+    if not pooled_X:
+        raise ValueError("Not enough history to train a forecast model")
+
+    pooled_coef, *_ = np.linalg.lstsq(np.vstack(pooled_X), np.concatenate(pooled_y), rcond=None)
+
+    # in-sample one-step errors, each source with the coefficients it will use
+    own = dict(zip(source_ids, coefs))
+    errors = []
+    for source_id, scores in series_by_source.items():
+        if len(scores) <= order:
+            continue
+        X, y = _lagged(scores, order)
+        errors.append(X @ own.get(source_id, pooled_coef) - y)
+    errors = np.concatenate(errors)
+
+    metrics = {
+        "samples": int(len(errors)),
+        "mae": round(float(np.abs(errors).mean()), 4),
+        "rmse": round(float(np.sqrt((errors ** 2).mean())), 4)
+    }
+    return (
+        np.asarray(source_ids, dtype=np.int64),
+        np.asarray(coefs, dtype=np.float64).reshape(-1, order + 1),
+        pooled_coef,
+        metrics
+    )
+
+
+def save_artifact(path, source_ids, coefs, pooled_coef, params):
+    """
+    Writes plain .npy arrays (memory-mappable) and a small meta.json.
+    Artifacts are immutable: an existing `path` is an error.
+    """
+    os.makedirs(path)
+    np.save(os.path.join(path, "source_ids.npy"), source_ids)
+    np.save(os.path.join(path, "coefs.npy"), coefs)
+    np.save(os.path.join(path, "pooled.npy"), pooled_coef)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"kind": KIND, **params}, f)
+
+
+class ForecastArtifact:
+    """
+    A trained autoregressive artifact. Coefficient arrays are memory-mapped,
+    so loading is O(1) and only the pages of the sources used are read.
+    """
+
+    def __init__(self, source_ids, coefs, pooled_coef, order, version=None):
+        self.source_ids = source_ids
+        self.coefs = coefs
+        self.pooled_coef = np.asarray(pooled_coef, dtype=np.float64)
+        self.order = order
+        self.version = version
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        mode = "r" if mmap else None
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(
+            np.load(os.path.join(path, "source_ids.npy"), mmap_mode=mode),
+            np.load(os.path.join(path, "coefs.npy"), mmap_mode=mode),
+            np.load(os.path.join(path, "pooled.npy")),
+            meta["order"],
+            meta.get("version")
+        )
+
+    def coefs_for(self, source_ids):
+        """
+        Coefficient rows for `source_ids`, pooled for sources not trained
+        """
+        source_ids = np.asarray(source_ids, dtype=np.int64)
+        rows = np.tile(self.pooled_coef, (len(source_ids), 1))
+        if len(self.source_ids):
+            idx = np.searchsorted(self.source_ids, source_ids)
+            idx = np.minimum(idx, len(self.source_ids) - 1)
+            found = self.source_ids[idx] == source_ids
+            rows[found] = self.coefs[idx[found]]
+        return rows
+
+    def predict(self, source_id, scores):
+        return self.predict_batch([source_id], [scores])[0]
+
+    def predict_batch(self, source_ids, series):
+        """
+        Next score per source from its last `order` scores (oldest -> newest).
+        Series shorter than `order` come back as NaN.
+        """
+        lags = np.full((len(series), self.order), np.nan)
+        for i, scores in enumerate(series):
+            tail = np.asarray(scores[-self.order:], dtype=np.float64)
+            if len(tail) == self.order:
+                lags[i] = tail
+
+        coefs = self.coefs_for(source_ids)
+        return coefs[:, 0] + (coefs[:, 1:] * lags).sum(axis=1)
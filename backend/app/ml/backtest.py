@@ -0,0 +1,238 @@
+import csv
+import time
+import tracemalloc
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from app.ml.artifacts import ForecastArtifact, fit_autoregressive
+from app.ml.batch import forecast_batch, pad_series
+from app.ml.model import RegressionState, RiskForecastModel
+
+MIN_HISTORY = 5
+
+
+# --- series -----------------------------------------------------------------
+
+def synthetic_series(count=200, length=300, seed=0):
+    """
+    Score series (0..100) mixing random walks, trends, daily seasonality
+    and level shifts, keyed by a fake source id
+    """
+    rng = np.random.default_rng(seed)
+    series = {}
+    t = np.arange(length)
+
+    for source_id in range(1, count + 1):
+        kind = source_id % 4
+        if kind == 0:
+            values = 50 + np.cumsum(rng.normal(0, 3, length))
+        elif kind == 1:
+            values = rng.uniform(10, 40) + rng.uniform(-0.2, 0.2) * t + rng.normal(0, 4, length)
+        elif kind == 2:
+            values = 50 + 25 * np.sin(2 * np.pi * t / 24) + rng.normal(0, 5, length)
+        else:
+            shifts = np.cumsum(rng.random(length) < 0.02) * rng.choice([-20, 20])
+            values = 40 + shifts + rng.normal(0, 3, length)
+        series[source_id] = np.clip(np.round(values), 0, 100)
+
+    return series
+
+
+def series_from_csv(path):
+    """
+    Series from an exported risk_history CSV
+    (water_source_id, recorded_at, risk_score columns; any order)
+    """
+    rows = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            rows.setdefault(int(row["water_source_id"]), []).append(
+                (row["recorded_at"], float(row["risk_score"]))
+            )
+    return {
+        source_id: np.array([score for _, score in sorted(points)])
+        for source_id, points in rows.items()
+    }
+
+
+def series_from_db(db, limit=None):
+    from app.services.risk_batch import load_recent_scores
+
+    return {
+        source_id: np.asarray(scores, dtype=np.float64)
+        for source_id, scores in load_recent_scores(db, limit=limit).items()
+    }
+
+
+# --- models -----------------------------------------------------------------
+
+class BacktestModel(ABC):
+    """
+    A forecaster under test. `fit` sees each series' training prefix once
+    (offline models); `predict` gets the history before one origin.
+    """
+
+    name = "model"
+
+    def fit(self, train_series):
+        pass
+
+    @abstractmethod
+    def predict(self, source_id, history):
+        ...
+
+    def predict_batch(self, source_ids, histories):
+        return [self.predict(s, h) for s, h in zip(source_ids, histories)]
+
+
+class LinearModel(BacktestModel):
+    """The production RiskForecastModel (sklearn fit per call)"""
+
+    def __init__(self, window=None, decay=1.0):
+        self.name = "linear" if window is None else f"linear[{window}]"
+        self.window = window
+        self.decay = decay
+
+    def predict(self, source_id, history):
+        model = RiskForecastModel(decay=self.decay)
+        model.train(history[-self.window:] if self.window else history)
+        return model.predict_next()
+
+    def predict_batch(self, source_ids, histories):
+        values, lengths = pad_series(histories, max_len=self.window)
+        return forecast_batch(values, lengths, min_history=1, decay=self.decay)
+
+
+class IncrementalModel(BacktestModel):
+    """
+    Running regression sums, advanced only by the scores appended since
+    the previous origin (as in production, one update per new reading)
+    """
+
+    def __init__(self, decay=1.0):
+        self.name = "incremental" if decay == 1.0 else f"incremental[{decay}]"
+        self.decay = decay
+        self._states = {}
+
+    def predict(self, source_id, history):
+        state = self._states.get(source_id)
+        if state is None or state.n > len(history):
+            state = self._states[source_id] = RegressionState()
+        for score in history[state.n:]:
+            state.update(score, self.decay)
+        return state.predict()
+
+
+class LastValueModel(BacktestModel):
+    """Naive baseline: tomorrow looks like today"""
+
+    name = "last_value"
+
+    def predict(self, source_id, history):
+        return float(history[-1])
+
+
+class AutoregressiveModel(BacktestModel):
+    """The trained registry model (app.ml.artifacts)"""
+
+    def __init__(self, order=3):
+        self.name = f"autoregressive[{order}]"
+        self.order = order
+        self.artifact = None
+
+    def fit(self, train_series):
+        source_ids, coefs, pooled, _ = fit_autoregressive(train_series, order=self.order)
+        self.artifact = ForecastArtifact(source_ids, coefs, pooled, self.order)
+
+    def predict(self, source_id, history):
+        return float(self.artifact.predict(source_id, history))
+
+    def predict_batch(self, source_ids, histories):
+        return self.artifact.predict_batch(source_ids, histories)
+
+
+DEFAULT_MODELS = (
+    LinearModel,
+    lambda: LinearModel(window=50),
+    IncrementalModel,
+    LastValueModel,
+    AutoregressiveModel
+)
+
+
+# --- harness ----------------------------------------------------------------
+
+def _percentile_us(samples, q):
+    return round(float(np.percentile(samples, q)) * 1e6, 1) if samples else None
+
+
+def backtest(model: BacktestModel, series, train_fraction=0.5, max_origins=50):
+    """
+    Rolling-origin evaluation: for each series, the model is fitted on the
+    first `train_fraction` and then forecasts every later point (up to
+    `max_origins` per series) from all history before it.
+    Reports accuracy, per-call latency, batch latency and peak memory
+    (traced over fit + batch only, tracing would distort the timings).
+    """
+    splits = {
+        source_id: max(MIN_HISTORY, int(len(values) * train_fraction))
+        for source_id, values in series.items()
+        if len(values) > MIN_HISTORY
+    }
+
+    tracemalloc.start()
+    model.fit({s: series[s][:split] for s, split in splits.items()})
+    _, fit_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    errors = []
+    latencies = []
+    for source_id, split in splits.items():
+        values = series[source_id]
+        for origin in range(split, min(len(values), split + max_origins)):
+            started = time.perf_counter()
+            forecast = model.predict(source_id, values[:origin])
+            latencies.append(time.perf_counter() - started)
+            if forecast is not None and not np.isnan(forecast):
+                errors.append(forecast - values[origin])
+
+    # one batch call forecasting the last point of every series
+    source_ids = list(splits)
+    histories = [series[s][:-1] for s in source_ids]
+    started = time.perf_counter()
+    model.predict_batch(source_ids, histories)
+    batch_seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    model.predict_batch(source_ids, histories)
+    _, batch_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    errors = np.asarray(errors)
+    return {
+        "model": model.name,
+        "series": len(splits),
+        "forecasts": int(len(errors)),
+        "mae": round(float(np.abs(errors).mean()), 3) if len(errors) else None,
+        "rmse": round(float(np.sqrt((errors ** 2).mean())), 3) if len(errors) else None,
+        "call_p50_us": _percentile_us(latencies, 50),
+        "call_p95_us": _percentile_us(latencies, 95),
+        "batch_ms": round(batch_seconds * 1e3, 2),
+        "batch_series": len(source_ids),
+        "peak_memory_kb": round(max(fit_peak, batch_peak) / 1024, 1)
+    }
+
+
+def run_backtests(series, models=None, **kwargs):
+    models = models or [factory() for factory in DEFAULT_MODELS]
+    return [backtest(model, series, **kwargs) for model in models]
+
+
+def format_report(results) -> str:
+    columns = list(results[0]) if results else []
+    widths = {c: max(len(c), *(len(str(r[c])) for r in results)) for c in columns}
+    lines = ["  ".join(c.ljust(widths[c]) for c in columns)]
+    for r in results:
+        lines.append("  ".join(str(r[c]).ljust(widths[c]) for c in columns))
+    return "\n".join(lines)
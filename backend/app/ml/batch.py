@@ -0,0 +1,58 @@
+import numpy as np
+
+
+def pad_series(series, max_len=None, dtype=np.float64):
+    """
+    Left-aligns score lists (oldest -> newest) into a zero-padded 2D array.
+    Returns (values, lengths); `max_len` keeps only the newest scores.
+    """
+    if max_len:
+        series = [s[-max_len:] for s in series]
+    lengths = np.fromiter((len(s) for s in series), dtype=np.int64, count=len(series))
+    width = int(lengths.max()) if len(series) else 0
+
+    values = np.zeros((len(series), width), dtype=dtype)
+    for i, s in enumerate(series):
+        values[i, :len(s)] = s
+    return values, lengths
+
+
+def forecast_batch(values, lengths, min_history=5, decay=1.0, steps=1):
+    """
+    Linear-trend forecasts for many series in one vectorized weighted
+    least-squares solve. Row i uses values[i, :lengths[i]] at x = 0..n-1
+    and is predicted at x = n - 1 + steps, exactly like
+    RiskForecastModel.predict_next. Rows shorter than `min_history`
+    come back as NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    lengths = np.asarray(lengths)
+    rows, width = values.shape
+    if not rows:
+        return np.empty(0)
+
+    x = np.arange(width, dtype=np.float64)
+    mask = x[None, :] < lengths[:, None]
+
+    if decay != 1.0:
+        age = np.maximum(lengths[:, None] - 1 - x[None, :], 0)
+        weights = np.where(mask, decay ** age, 0.0)
+    else:
+        weights = mask.astype(np.float64)
+
+    total = weights.sum(axis=1)
+    safe_total = np.where(total > 0, total, 1.0)
+
+    # centred sums: numerically stable for long series
+    x_mean = (weights * x).sum(axis=1) / safe_total
+    y_mean = (weights * values).sum(axis=1) / safe_total
+    dx = np.where(mask, x[None, :] - x_mean[:, None], 0.0)
+    dy = np.where(mask, values - y_mean[:, None], 0.0)
+
+    sxx = (weights * dx * dx).sum(axis=1)
+    sxy = (weights * dx * dy).sum(axis=1)
+    slope = np.divide(sxy, sxx, out=np.zeros(rows), where=sxx > 1e-12)
+
+    forecasts = y_mean + slope * (lengths - 1 + steps - x_mean)
+    forecasts[lengths < min_history] = np.nan
+    return forecasts
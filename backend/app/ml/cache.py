@@ -0,0 +1,57 @@
+import threading
+from collections import OrderedDict
+
+MISS = object()
+
+
+class ForecastCache:
+    """
+    LRU of forecasts keyed by source id. Each entry remembers the history
+    version (latest RiskHistory id + recorded_at) it was fitted on, so a
+    new reading makes the old entry a miss without explicit invalidation.
+    Thread-safe: update_risk builds dashboards in a thread pool.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # source_id -> (version, forecast)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, source_id, version):
+        with self._lock:
+            entry = self._entries.get(source_id)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(source_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, source_id, version, forecast):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[source_id] = (version, forecast)
+            self._entries.move_to_end(source_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, source_id=None):
+        with self._lock:
+            if source_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(source_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses
+        }
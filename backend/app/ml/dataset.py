@@ -1,12 +1,38 @@
-import pandas as pd
+import numpy as np
+from sqlalchemy import select
 
-def build_dataset(risk_history):
+from app.models.risk_history import RiskHistory
+
+
+def load_series(db, source_id, limit=None, since=None, until=None, dtype=np.float64):
+    """
+    Fetches only (recorded_at, risk_score) for one source through Core
+    (no ORM objects, no DataFrame) into NumPy arrays, oldest -> newest.
+    `limit` keeps the newest N readings, `since`/`until` bound the time
+    range; pass dtype=np.float32 to halve the score buffer.
+    """
+    stmt = select(RiskHistory.recorded_at, RiskHistory.risk_score).where(
+        RiskHistory.water_source_id == source_id
+    )
+    if since is not None:
+        stmt = stmt.where(RiskHistory.recorded_at >= since)
+    if until is not None:
+        stmt = stmt.where(RiskHistory.recorded_at <= until)
+    stmt = stmt.order_by(RiskHistory.recorded_at.desc(), RiskHistory.id.desc())
+    if limit:
+        stmt = stmt.limit(limit)
+
+    rows = db.execute(stmt).all()
+    rows.reverse()
+
+    timestamps = np.array([r[0] for r in rows], dtype="datetime64[us]")
+    scores = np.fromiter((r[1] for r in rows), dtype=dtype, count=len(rows))
+    return timestamps, scores
+
+
+def scores_in_order(risk_history, dtype=np.float64):
     """
-    Converts DB rows into ML-ready dataframe
+    Scores of already-loaded RiskHistory rows, sorted by recorded_at
     """
-    return pd.DataFrame(
-        [{
-            "timestamp": r.created_at,
-            "risk": r.risk_score
-        } for r in risk_history]
-    ).sort_values("timestamp")
\ No newline at end of file
+    rows = sorted(risk_history, key=lambda r: r.recorded_at)
+    return np.fromiter((r.risk_score for r in rows), dtype=dtype, count=len(rows))
@@ -1,15 +1,117 @@
 from sklearn.linear_model import LinearRegression
 import numpy as np
 
+
+class RegressionState:
+    """
+    Sufficient statistics of a weighted least-squares line through a
+    score series: O(1) to update, O(1) to forecast from.
+    x is re-based on every update so the newest score sits at x = 0,
+    which keeps the sums small and makes exponential decay a plain
+    multiplication.
+    """
+
+    __slots__ = ("n", "w", "sx", "sy", "sxy", "sxx")
+
+    def __init__(self, n=0, w=0.0, sx=0.0, sy=0.0, sxy=0.0, sxx=0.0):
+        self.n = n  # scores seen (undecayed)
+        self.w = w  # sum of weights
+        self.sx = sx
+        self.sy = sy
+        self.sxy = sxy
+        self.sxx = sxx
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        From a SourceRiskState row (reg_* columns); empty if never scored
+        """
+        if row is None or not row.reg_n:
+            return cls()
+        return cls(row.reg_n, row.reg_w, row.reg_sx, row.reg_sy, row.reg_sxy, row.reg_sxx)
+
+    def as_columns(self) -> dict:
+        return {
+            "reg_n": self.n,
+            "reg_w": self.w,
+            "reg_sx": self.sx,
+            "reg_sy": self.sy,
+            "reg_sxy": self.sxy,
+            "reg_sxx": self.sxx
+        }
+
+    def update(self, y: float, decay: float = 1.0):
+        # shift existing points one step into the past (x -> x - 1)
+        self.sxx += self.w - 2 * self.sx
+        self.sxy -= self.sy
+        self.sx -= self.w
+
+        if decay != 1.0:
+            self.w *= decay
+            self.sx *= decay
+            self.sy *= decay
+            self.sxy *= decay
+            self.sxx *= decay
+
+        # new point at x = 0
+        self.w += 1.0
+        self.sy += y
+        self.n += 1
+        return self
+
+    def predict(self, steps: int = 1):
+        if not self.w:
+            return None
+
+        denominator = self.w * self.sxx - self.sx * self.sx
+        slope = 0.0
+        if abs(denominator) > 1e-9:
+            slope = (self.w * self.sxy - self.sx * self.sy) / denominator
+        intercept = (self.sy - slope * self.sx) / self.w
+
+        return float(intercept + slope * steps)
+
+
 class RiskForecastModel:
-    def __init__(self):
+    """
+    Linear trend over the score index. `decay` < 1 down-weights older
+    scores geometrically (1.0 = ordinary least squares).
+    incremental=True keeps a RegressionState instead of fitting sklearn,
+    so update() and predict_next() are O(1) regardless of history length.
+    """
+
+    def __init__(self, incremental=False, decay=1.0, state=None):
+        self.incremental = incremental
+        self.decay = decay
+        self.state = state or RegressionState()
         self.model = LinearRegression()
+        self.n_ = 0
 
     def train(self, risks):
+        if self.incremental:
+            self.state = RegressionState()
+            for risk in risks:
+                self.state.update(risk, self.decay)
+            return
+
         X = np.arange(len(risks)).reshape(-1, 1)
         y = risks
-        self.model.fit(X, y)
+        weights = None
+        if self.decay != 1.0:
+            weights = self.decay ** np.arange(len(risks) - 1, -1, -1)
+        self.model.fit(X, y, sample_weight=weights)
+        self.n_ = len(risks)
+
+    def update(self, risk):
+        """
+        Appends one score (incremental mode only)
+        """
+        self.state.update(risk, self.decay)
 
     def predict_next(self, steps=1):
-        next_x = np.array([[len(self.model.coef_) + steps]])
-        return float(self.model.predict(next_x)[0])
\ No newline at end of file
+        if self.incremental:
+            return self.state.predict(steps)
+
+        # the training points sit at x = 0 .. n-1
+        next_x = np.array([[self.n_ - 1 + steps]])
+        return float(self.model.predict(next_x)[0])
@@ -1,14 +1,117 @@
-from app.ml.dataset import build_dataset
-from app.ml.model import RiskForecastModel
+import numpy as np
 
-def forecast_risk(risk_history):
-    if len(risk_history) < 5:
+from app.core.config import get_settings
+from app.ml.batch import forecast_batch, pad_series
+from app.ml.cache import MISS, ForecastCache
+from app.ml.dataset import scores_in_order
+from app.ml.model import RegressionState, RiskForecastModel
+from app.ml.registry import ActiveModel
+
+MIN_HISTORY = 5
+
+settings = get_settings()
+forecast_cache = ForecastCache(settings.forecast_cache_size)
+active_model = ActiveModel(settings.model_registry_refresh_seconds)
+
+
+def trained_model():
+    """
+    The active registry artifact with FORECAST_MODEL=artifact, else None
+    (also None until a model has been trained and activated)
+    """
+    if settings.forecast_model != "artifact":
         return None
+    return active_model.get()
 
-    df = build_dataset(risk_history)
-    risks = df["risk"].values
 
-    model = RiskForecastModel()
+def _as_forecasts(values):
+    return [None if np.isnan(f) else float(f) for f in values]
+
+
+def forecast_scores(risks, source_id=None):
+    """
+    Forecast from a plain list of scores (oldest -> newest).
+    With a `source_id` the active trained model is used when there is one
+    (falling back to the linear model while the history is shorter than
+    its order).
+    """
+    if len(risks) < MIN_HISTORY:
+        return None
+
+    artifact = trained_model() if source_id is not None else None
+    if artifact is not None:
+        forecast = artifact.predict(source_id, risks)
+        if not np.isnan(forecast):
+            return float(forecast)
+
+    model = RiskForecastModel(decay=settings.forecast_decay)
     model.train(risks)
 
-    return model.predict_next()
\ No newline at end of file
+    return model.predict_next()
+
+
+def _linear_many(series):
+    values, lengths = pad_series(series)
+    return forecast_batch(
+        values,
+        lengths,
+        min_history=MIN_HISTORY,
+        decay=settings.forecast_decay
+    )
+
+
+def forecast_many(series, source_ids=None):
+    """
+    forecast_scores for many score lists in one vectorized solve.
+    Returns a list aligned with `series` (None where history is too short).
+    """
+    if not series:
+        return []
+
+    artifact = trained_model() if source_ids is not None else None
+    if artifact is None:
+        return _as_forecasts(_linear_many(series))
+
+    forecasts = artifact.predict_batch(source_ids, series)
+    forecasts[[len(s) < MIN_HISTORY for s in series]] = np.nan
+
+    # histories shorter than the artifact's order get the linear forecast
+    fallback = [
+        i for i, s in enumerate(series)
+        if np.isnan(forecasts[i]) and len(s) >= MIN_HISTORY
+    ]
+    if fallback:
+        forecasts[fallback] = _linear_many([series[i] for i in fallback])
+    return _as_forecasts(forecasts)
+
+
+def forecast_from_state(state: RegressionState):
+    """
+    O(1) forecast from running regression sums (incremental mode)
+    """
+    if state.n < MIN_HISTORY:
+        return None
+    return state.predict()
+
+
+def forecast_risk(risk_history, source_id=None):
+    if len(risk_history) < MIN_HISTORY:
+        return None
+
+    return forecast_scores(scores_in_order(risk_history), source_id)
+
+
+def cached_forecast(source_id, version, load_scores):
+    """
+    Forecast for `source_id` at history `version` (latest RiskHistory
+    id/recorded_at). `load_scores` (-> scores oldest -> newest) is only
+    called on a cache miss. Activating another trained model also misses.
+    """
+    artifact = trained_model()
+    version = (version, artifact.version if artifact else None)
+
+    forecast = forecast_cache.get(source_id, version)
+    if forecast is MISS:
+        forecast = forecast_scores(load_scores(), source_id)
+        forecast_cache.put(source_id, version, forecast)
+    return forecast
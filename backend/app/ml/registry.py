@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.ml.artifacts import ForecastArtifact
+from app.models.forecast_model import ForecastModel
+from app.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def register_model(db: Session, version, kind, path, sources, params, metrics, activate=True):
+    """
+    Records a trained artifact. Does NOT commit.
+    """
+    model = ForecastModel(
+        version=version,
+        kind=kind,
+        path=path,
+        sources=sources,
+        params=json.dumps(params),
+        metrics=json.dumps(metrics)
+    )
+    db.add(model)
+    db.flush()
+    if activate:
+        activate_model(db, version)
+    return model
+
+
+def activate_model(db: Session, version):
+    """
+    Makes `version` the only active model (also used to roll back).
+    Does NOT commit.
+    """
+    model = db.execute(
+        select(ForecastModel).where(ForecastModel.version == version)
+    ).scalar_one_or_none()
+    if model is None:
+        raise ValueError(f"Unknown forecast model version {version}")
+
+    db.execute(update(ForecastModel).values(is_active=False))
+    model.is_active = True
+    return model
+
+
+class ActiveModel:
+    """
+    Lazily loaded, memory-mapped artifact of the active registry row.
+    The registry is re-checked at most every `refresh_seconds`; the
+    artifact is only reopened when the active version changes.
+    """
+
+    def __init__(self, refresh_seconds: int = 60):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._checked = None
+        self._model_id = None
+        self._artifact = None
+
+    def get(self):
+        now = time.monotonic()
+        if self._checked is not None and now - self._checked < self.refresh_seconds:
+            return self._artifact
+
+        with self._lock:
+            if self._checked is None or now - self._checked >= self.refresh_seconds:
+                self._refresh()
+                self._checked = now
+        return self._artifact
+
+    def _refresh(self):
+        db = SessionLocal()
+        try:
+            row = db.execute(
+                select(ForecastModel.id, ForecastModel.version, ForecastModel.path)
+                .where(ForecastModel.is_active == True)
+            ).first()
+        finally:
+            db.close()
+
+        if row is None:
+            self._model_id, self._artifact = None, None
+            return
+        if row.id == self._model_id:
+            return
+
+        try:
+            artifact = ForecastArtifact.load(row.path)
+            artifact.version = row.version
+        except (OSError, ValueError, KeyError) as e:
+            # keep serving the previous artifact (or the linear fallback)
+            logger.error(f"Could not load forecast model {row.version}: {e}")
+            return
+
+        self._model_id, self._artifact = row.id, artifact
+        logger.info(f"Loaded forecast model {row.version}")
+
+    def invalidate(self):
+        self._checked = None
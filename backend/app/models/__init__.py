@@ -0,0 +1,14 @@
+# Import every model so Base.metadata can resolve all foreign keys
+# (e.g. organizations.id) in any entry point: API, worker, shard processes.
+from app.models.organization import Organization
+from app.models.user import User, PushNotification
+from app.models.membership import Membership
+from app.models.water_source import WaterSource
+from app.models.risk_history import RiskHistory
+from app.models.alert import Alert
+from app.models.recalculation_run import RecalculationRun
+from app.models.scheduler_lease import SchedulerLease
+from app.models.risk_rule_set import RiskRuleSet
+from app.models.source_risk_state import SourceRiskState
+from app.models.forecast_model import ForecastModel
+from app.models.risk_rollup import RiskRollup
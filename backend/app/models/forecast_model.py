@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean
+from datetime import datetime
+from app.core.database import Base
+
+class ForecastModel(Base):
+    """
+    Registry of trained forecast artifacts (see app.ml.artifacts).
+    At most one row is active; forecasts load it lazily.
+    """
+    __tablename__ = "forecast_models"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(String(40), nullable=False, unique=True)
+    kind = Column(String(30), nullable=False)  # autoregressive
+    path = Column(String(255), nullable=False)  # artifact directory
+    sources = Column(Integer, default=0)  # sources with their own coefficients
+    params = Column(Text, nullable=True)  # JSON: order, window, ...
+    metrics = Column(Text, nullable=True)  # JSON: training MAE/RMSE
+    is_active = Column(Boolean, default=False, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from datetime import datetime
+from app.core.database import Base
+
+class RecalculationRun(Base):
+    __tablename__ = "recalculation_runs"
+
+    id = Column(Integer, primary_key=True)
+    mode = Column(String(20), default="batch")  # batch (checkpointed), sharded, legacy, adaptive
+    status = Column(String(20), default="running", index=True)  # running, completed, failed, resume_requested, abandoned
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    last_source_id = Column(Integer, default=0)  # checkpoint, committed with each chunk
+    sources_processed = Column(Integer, default=0)
+    attempts = Column(Integer, default=1)
+    error = Column(String(255), nullable=True)
+    metrics = Column(Text, nullable=True)  # JSON: stage timings, queries, rows written
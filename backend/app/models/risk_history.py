@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
 from datetime import datetime
 from app.core.database import Base
 
@@ -14,3 +14,7 @@ class RiskHistory(Base):
         nullable=False
     )
     recorded_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_risk_history_source_recorded", "water_source_id", "recorded_at"),
+    )
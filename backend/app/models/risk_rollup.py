@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from app.core.database import Base
+
+class RiskRollup(Base):
+    """
+    Pre-aggregated risk_history per source and hour/day/month bucket,
+    maintained incrementally with every RiskHistory write
+    (see app.services.rollups).
+    """
+    __tablename__ = "risk_rollups"
+
+    water_source_id = Column(
+        Integer,
+        ForeignKey("water_sources.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    granularity = Column(String(10), primary_key=True)  # hour, day, month
+    bucket_start = Column(DateTime, primary_key=True)
+    organization_id = Column(
+        Integer,
+        ForeignKey("organizations.id"),
+        nullable=False,
+        index=True
+    )
+
+    readings = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0.0)  # mean = total / readings
+    min_score = Column(Float)
+    max_score = Column(Float)
+    last_score = Column(Float)
+    last_at = Column(DateTime)
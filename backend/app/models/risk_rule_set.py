@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from datetime import datetime
+from app.core.database import Base
+
+class RiskRuleSet(Base):
+    """
+    Per-organization risk thresholds. Organizations without a row use the
+    defaults in app.services.risk_rules.
+    """
+    __tablename__ = "risk_rule_sets"
+
+    id = Column(Integer, primary_key=True)
+    organization_id = Column(
+        Integer,
+        ForeignKey("organizations.id"),
+        nullable=False,
+        unique=True
+    )
+
+    # calculate_risk: points added when a reading is below its threshold
+    rainfall_threshold = Column(Float, nullable=False, default=50)
+    rainfall_points = Column(Integer, nullable=False, default=40)
+    water_level_threshold = Column(Float, nullable=False, default=20)
+    water_level_points = Column(Integer, nullable=False, default=60)
+
+    # determine_alert_level: medium / high / critical from these scores
+    alert_medium = Column(Float, nullable=False, default=40)
+    alert_high = Column(Float, nullable=False, default=65)
+    alert_critical = Column(Float, nullable=False, default=85)
+
+    # map_status: moderate / high / critical from these scores
+    status_moderate = Column(Float, nullable=False, default=30)
+    status_high = Column(Float, nullable=False, default=60)
+    status_critical = Column(Float, nullable=False, default=80)
+
+    version = Column(Integer, nullable=False, default=1)  # bumped on every change
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, LargeBinary
+from app.core.database import Base
+
+class SourceRiskState(Base):
+    """
+    Latest risk per water source, maintained in the same transaction as
+    every RiskHistory write so readers need one row per source.
+    """
+    __tablename__ = "source_risk_states"
+
+    water_source_id = Column(
+        Integer,
+        ForeignKey("water_sources.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    organization_id = Column(
+        Integer,
+        ForeignKey("organizations.id"),
+        nullable=False,
+        index=True
+    )
+    risk_score = Column(Integer)
+    status = Column(String(20))  # safe, moderate, high, critical
+    trend = Column(String(20))  # rising, falling, stable
+    forecast = Column(Float, nullable=True)
+    recorded_at = Column(DateTime)
+
+    # running regression sums over all scores (see ml.model.RegressionState)
+    reg_n = Column(Integer, nullable=False, default=0)
+    reg_w = Column(Float, nullable=False, default=0.0)
+    reg_sx = Column(Float, nullable=False, default=0.0)
+    reg_sy = Column(Float, nullable=False, default=0.0)
+    reg_sxy = Column(Float, nullable=False, default=0.0)
+    reg_sxx = Column(Float, nullable=False, default=0.0)
+
+    # rolling statistics over the last ROLLING_WINDOW scores
+    # (see services.rolling_stats.RollingStats)
+    roll_buffer = Column(LargeBinary, nullable=True)  # float32 scores, oldest first
+    ewma = Column(Float, nullable=True)
+    roll_mean = Column(Float, nullable=True)
+    roll_std = Column(Float, nullable=True)
+    roll_slope = Column(Float, nullable=True)
+    roll_min = Column(Float, nullable=True)
+    roll_max = Column(Float, nullable=True)
+    # running sums of the window (x = 0 for the newest score), so loading
+    # the state does not replay the buffer
+    roll_sum = Column(Float, nullable=True)
+    roll_sum_sq = Column(Float, nullable=True)
+    roll_sum_xy = Column(Float, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, event
 from datetime import datetime
 from app.core.database import Base
 
@@ -17,3 +17,17 @@ class WaterSource(Base):
         nullable=False
     )
     last_updated = Column(DateTime, default=datetime.utcnow)
+
+    # incremental recalculation
+    needs_recalculation = Column(Boolean, default=True, nullable=False, index=True)
+    forecast_expires_at = Column(DateTime, nullable=True, index=True)
+
+
+def _mark_dirty(target, value, oldvalue, initiator):
+    if value != oldvalue:
+        target.needs_recalculation = True
+
+
+# any ORM write of a new reading flags the source for the scheduler
+event.listen(WaterSource.rainfall, "set", _mark_dirty)
+event.listen(WaterSource.water_level, "set", _mark_dirty)
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+
+
+class RiskRulesIn(BaseModel):
+    rainfall_threshold: float = 50
+    rainfall_points: int = 40
+    water_level_threshold: float = 20
+    water_level_points: int = 60
+    alert_medium: float = 40
+    alert_high: float = 65
+    alert_critical: float = 85
+    status_moderate: float = 30
+    status_high: float = 60
+    status_critical: float = 80
+
+
+class RiskRulesOut(RiskRulesIn):
+    organization_id: int
+    version: int
+
+    class Config:
+        from_attributes = True
@@ -13,10 +13,19 @@ class WaterSourceOut(WaterSourceCreate):
     class Config:
         orm_mode = True
 
+class RollingStatsOut(BaseModel):
+    ewma: float | None
+    mean: float | None
+    std: float | None
+    slope: float | None
+    min: float | None
+    max: float | None
+
 class WaterSourceDashboard(BaseModel):
     id: int
     name: str
     risk_score: float
     trend: str
     forecast: float | None
-    status: str
\ No newline at end of file
+    status: str
+    stats: RollingStatsOut | None = None
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+Rebuilds risk_rollups (hour/day/month buckets) from risk_history, one
+chunk of sources per transaction. Safe to re-run; run it once after the
+migration that creates the table.
+
+    python -m app.scripts.backfill_rollups
+"""
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models.risk_history import RiskHistory
+from app.services.risk_batch import iter_source_chunks
+from app.services.rollups import replace_rollups
+
+
+def backfill(chunk_size=200):
+    db = SessionLocal()
+    sources = buckets = 0
+    try:
+        for chunk in iter_source_chunks(db, chunk_size=chunk_size):
+            ids = [s.id for s in chunk]
+            # older history rows may lack organization_id: take the source's
+            organizations = {s.id: s.organization_id for s in chunk}
+            result = db.execute(
+                select(
+                    RiskHistory.water_source_id,
+                    RiskHistory.risk_score,
+                    RiskHistory.recorded_at
+                )
+                .where(
+                    RiskHistory.water_source_id.in_(ids),
+                    RiskHistory.recorded_at != None
+                )
+                .execution_options(yield_per=10000)
+            )
+            history = (
+                {
+                    "water_source_id": source_id,
+                    "organization_id": organizations[source_id],
+                    "risk_score": score,
+                    "recorded_at": recorded_at
+                }
+                for source_id, score, recorded_at in result
+            )
+
+            buckets += replace_rollups(db, ids, history)
+            db.commit()
+            sources += len(ids)
+    finally:
+        db.close()
+
+    print(f"Rebuilt {buckets} rollup buckets for {sources} sources")
+
+
+if __name__ == "__main__":
+    backfill()
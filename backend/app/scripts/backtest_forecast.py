@@ -0,0 +1,56 @@
+"""
+Backtests forecast models for accuracy (MAE/RMSE) and speed (per-call
+and batch latency, peak memory) on rolling origins.
+
+    python -m app.scripts.backtest_forecast                       # synthetic series
+    python -m app.scripts.backtest_forecast --csv export.csv      # exported risk_history
+    python -m app.scripts.backtest_forecast --db --limit 1000     # live risk_history
+"""
+import argparse
+import json
+
+from app.ml.backtest import (
+    format_report,
+    run_backtests,
+    series_from_csv,
+    series_from_db,
+    synthetic_series
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest forecast models")
+    parser.add_argument("--csv", help="risk_history export (water_source_id, recorded_at, risk_score)")
+    parser.add_argument("--db", action="store_true", help="read risk_history from DATABASE_URL")
+    parser.add_argument("--limit", type=int, default=None, help="newest scores per source (--db)")
+    parser.add_argument("--sources", type=int, default=200, help="synthetic series")
+    parser.add_argument("--length", type=int, default=300, help="synthetic series length")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--train-fraction", type=float, default=0.5)
+    parser.add_argument("--max-origins", type=int, default=50, help="forecasts per series")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if args.csv:
+        series = series_from_csv(args.csv)
+    elif args.db:
+        from app.core.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            series = series_from_db(db, limit=args.limit)
+        finally:
+            db.close()
+    else:
+        series = synthetic_series(args.sources, args.length, args.seed)
+
+    results = run_backtests(
+        series,
+        train_fraction=args.train_fraction,
+        max_origins=args.max_origins
+    )
+    print(json.dumps(results, indent=2) if args.json else format_report(results))
+
+
+if __name__ == "__main__":
+    main()
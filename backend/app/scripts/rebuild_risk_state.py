@@ -0,0 +1,102 @@
+"""
+Rebuilds source_risk_states from risk_history, e.g. once after the
+migration that introduces the table, or after changing FORECAST_DECAY or
+ROLLING_EWMA_ALPHA (the running sums and EWMA depend on them).
+Safe to re-run.
+
+    python -m app.scripts.rebuild_risk_state
+"""
+from sqlalchemy import func, select
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.ml.model import RegressionState
+from app.ml.predictor import forecast_from_state, forecast_many
+from app.models.risk_history import RiskHistory
+from app.services.risk_batch import (
+    TREND_WINDOW,
+    forecast_lookback,
+    iter_source_chunks,
+    load_recent_scores
+)
+from app.services.risk_rules import get_rules_for_orgs
+from app.services.risk_state import upsert_states
+from app.services.rolling_stats import RollingStats
+from app.services.trends import calculate_trend
+
+settings = get_settings()
+
+
+def regression_of(scores):
+    state = RegressionState()
+    for score in scores:
+        state.update(score, settings.forecast_decay)
+    return state
+
+
+def rolling_of(scores):
+    stats = RollingStats()
+    for score in scores:
+        stats.update(score)
+    return stats
+
+
+def rebuild(chunk_size=1000):
+    """
+    Running sums and rolling window from each source's full history;
+    forecasts exactly as the recalculation job makes them (same lookback,
+    trained model or incremental sums)
+    """
+    incremental = settings.forecast_incremental and settings.forecast_model != "artifact"
+    limit, since = forecast_lookback(settings.recalc_history_limit)
+
+    db = SessionLocal()
+    total = 0
+    try:
+        for sources in iter_source_chunks(db, chunk_size=chunk_size):
+            ids = [s.id for s in sources]
+            history = load_recent_scores(db, ids)
+            recorded = dict(db.execute(
+                select(RiskHistory.water_source_id, func.max(RiskHistory.recorded_at))
+                .where(RiskHistory.water_source_id.in_(ids))
+                .group_by(RiskHistory.water_source_id)
+            ).all())
+            rules = get_rules_for_orgs(db, {s.organization_id for s in sources})
+
+            scored = [s for s in sources if history.get(s.id)]
+            regressions = [regression_of(history[s.id]) for s in scored]
+            if incremental:
+                forecasts = [forecast_from_state(r) for r in regressions]
+            else:
+                lookback = load_recent_scores(db, ids, limit=limit, since=since)
+                forecasts = forecast_many(
+                    [lookback.get(s.id, []) for s in scored],
+                    [s.id for s in scored]
+                )
+
+            rows = []
+            for source, regression, forecast in zip(scored, regressions, forecasts):
+                scores = history[source.id]
+                rows.append({
+                    "water_source_id": source.id,
+                    "organization_id": source.organization_id,
+                    "risk_score": scores[-1],
+                    "status": rules[source.organization_id].status(scores[-1]),
+                    "trend": calculate_trend(scores[-TREND_WINDOW:]),
+                    "forecast": forecast,
+                    "recorded_at": recorded.get(source.id),
+                    **regression.as_columns(),
+                    **rolling_of(scores).as_columns()
+                })
+
+            upsert_states(db, rows)
+            db.commit()
+            total += len(rows)
+    finally:
+        db.close()
+
+    print(f"Rebuilt risk state for {total} sources")
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,83 @@
+"""
+Offline training of the forecast model: fits per-source autoregressive
+coefficients (pooled for short histories), saves them as a versioned,
+memory-mappable artifact under MODEL_ARTIFACT_DIR and registers it.
+
+    python -m app.scripts.train_forecast_model [--order 3] [--window 500] [--no-activate]
+    python -m app.scripts.train_forecast_model --activate VERSION   # roll back / forward
+
+Forecasts use the active version with FORECAST_MODEL=artifact.
+"""
+import argparse
+import os
+from datetime import datetime
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.ml.artifacts import KIND, fit_autoregressive, save_artifact
+from app.ml.registry import activate_model, register_model
+from app.services.risk_batch import iter_source_chunks, load_recent_scores
+
+settings = get_settings()
+
+
+def load_training_series(db, window, chunk_size=1000):
+    series = {}
+    for sources in iter_source_chunks(db, chunk_size=chunk_size):
+        series.update(load_recent_scores(db, [s.id for s in sources], limit=window))
+    return series
+
+
+def train(order=3, window=None, activate=True):
+    window = window or settings.forecast_history_limit
+    version = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+    path = os.path.abspath(os.path.join(settings.model_artifact_dir, version))
+
+    db = SessionLocal()
+    try:
+        series = load_training_series(db, window)
+        source_ids, coefs, pooled, metrics = fit_autoregressive(series, order=order)
+
+        params = {"version": version, "order": order, "window": window}
+        save_artifact(path, source_ids, coefs, pooled, params)
+        register_model(
+            db,
+            version=version,
+            kind=KIND,
+            path=path,
+            sources=len(source_ids),
+            params=params,
+            metrics=metrics,
+            activate=activate
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"Trained forecast model {version} ({len(source_ids)} sources): {metrics}")
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or activate forecast models")
+    parser.add_argument("--order", type=int, default=3, help="lagged scores per prediction")
+    parser.add_argument("--window", type=int, default=None, help="newest scores per source to train on")
+    parser.add_argument("--no-activate", action="store_true", help="register without activating")
+    parser.add_argument("--activate", metavar="VERSION", help="activate an existing version and exit")
+    args = parser.parse_args()
+
+    if args.activate:
+        db = SessionLocal()
+        try:
+            activate_model(db, args.activate)
+            db.commit()
+        finally:
+            db.close()
+        print(f"Activated forecast model {args.activate}")
+        return
+
+    train(order=args.order, window=args.window, activate=not args.no_activate)
+
+
+if __name__ == "__main__":
+    main()
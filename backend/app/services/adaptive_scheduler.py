@@ -0,0 +1,160 @@
+import heapq
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.metrics import RunMetrics
+from app.models.source_risk_state import SourceRiskState
+from app.models.water_source import WaterSource
+from app.services.risk_batch import load_sources, recalculate_batch
+from app.services.risk_rules import get_rules_for_orgs
+from app.services.status_mapper import map_status
+
+# seconds between evaluations, by status of max(risk, forecast)
+EVALUATION_INTERVALS = {
+    "critical": 5 * 60,
+    "high": 30 * 60,
+    "moderate": 4 * 60 * 60,
+    "safe": 24 * 60 * 60
+}
+MIN_INTERVAL = 60
+RISING_BONUS = 20
+
+
+def effective_risk(risk, forecast=None):
+    return max(risk or 0, forecast or 0)
+
+
+def evaluation_priority(risk, trend, forecast=None) -> float:
+    """
+    Higher = evaluate first when more sources are due than the budget allows
+    """
+    score = effective_risk(risk, forecast)
+    if trend == "rising":
+        score += RISING_BONUS
+    return score
+
+
+def evaluation_interval(risk, trend, forecast=None, rules=None) -> int:
+    """
+    Critical/rising sources every few minutes, safe/stable ones daily.
+    Status comes from the organization's `rules` (defaults if None).
+    """
+    interval = EVALUATION_INTERVALS[map_status(effective_risk(risk, forecast), rules)]
+    if trend == "rising":
+        interval //= 2
+    return max(MIN_INTERVAL, interval)
+
+
+class AdaptiveRiskScheduler:
+    """
+    In-memory priority queue of water sources keyed by next due time.
+    Each tick evaluates the highest-priority due sources, capped by the
+    hourly evaluation budget, and re-queues them with an interval derived
+    from their new risk score, trend and forecast.
+    """
+
+    def __init__(self, budget_per_hour: int, tick_seconds: int, refresh_every: int = 10):
+        self.budget_per_hour = budget_per_hour
+        self.tick_seconds = tick_seconds
+        self.refresh_every = refresh_every
+        self._queue = []  # (due_at, -priority, source_id)
+        self._known = set()
+        self._ticks = 0
+
+    @property
+    def tick_budget(self) -> int:
+        return max(1, self.budget_per_hour * self.tick_seconds // 3600)
+
+    def __len__(self):
+        return len(self._queue)
+
+    def _push(self, source_id, due_at, priority):
+        heapq.heappush(self._queue, (due_at, -priority, source_id))
+        self._known.add(source_id)
+
+    def refresh(self, db: Session):
+        """
+        Queues sources we don't know yet, prioritised by their stored
+        score, trend and forecast (source_risk_states, one outer join over
+        all sources, no id list); they are due immediately.
+        """
+        rows = db.execute(
+            select(
+                WaterSource.id,
+                SourceRiskState.risk_score,
+                SourceRiskState.trend,
+                SourceRiskState.forecast
+            ).outerjoin(SourceRiskState, SourceRiskState.water_source_id == WaterSource.id)
+        )
+        now = time.monotonic()
+        queued = 0
+
+        for row in rows:
+            if row.id in self._known:
+                continue
+            self._push(
+                row.id,
+                now,
+                evaluation_priority(row.risk_score, row.trend or "stable", row.forecast)
+            )
+            queued += 1
+
+        return queued
+
+    def take_due(self, now=None):
+        """
+        Pops due sources, highest priority first, up to the tick budget.
+        Due sources over budget stay queued for the next tick.
+        """
+        now = time.monotonic() if now is None else now
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue))
+
+        due.sort(key=lambda entry: entry[1])
+        chosen, deferred = due[:self.tick_budget], due[self.tick_budget:]
+
+        for entry in deferred:
+            heapq.heappush(self._queue, entry)
+        for entry in chosen:
+            self._known.discard(entry[2])
+
+        return [entry[2] for entry in chosen]
+
+    def requeue(self, outcomes, now=None, rules_by_org=None):
+        now = time.monotonic() if now is None else now
+        rules_by_org = rules_by_org or {}
+        for o in outcomes:
+            rules = rules_by_org.get(o["organization_id"])
+            self._push(
+                o["source_id"],
+                now + evaluation_interval(o["risk"], o["trend"], o["forecast"], rules),
+                evaluation_priority(o["risk"], o["trend"], o["forecast"])
+            )
+
+    def tick(self, db: Session, history_limit=None, forecast_ttl_hours=72, metrics: RunMetrics = None):
+        """
+        One scheduling round. Does NOT commit.
+        """
+        if self._ticks % self.refresh_every == 0:
+            self.refresh(db)
+        self._ticks += 1
+
+        source_ids = self.take_due()
+        if not source_ids:
+            return []
+
+        # sources deleted since they were queued simply drop out here
+        sources = load_sources(db, source_ids=source_ids)
+        outcomes = recalculate_batch(
+            db,
+            sources,
+            history_limit=history_limit,
+            forecast_ttl_hours=forecast_ttl_hours,
+            metrics=metrics
+        )
+        rules = get_rules_for_orgs(db, {o["organization_id"] for o in outcomes})
+        self.requeue(outcomes, rules_by_org=rules)
+        return outcomes
@@ -1,11 +1,8 @@
-def determine_alert_level(risk_score: float):
-    if risk_score >= 85:
-        return "critical"
-    if risk_score >= 65:
-        return "high"
-    if risk_score >= 40:
-        return "medium"
-    return None
+from app.services.risk_rules import DEFAULT_RULES
+
+
+def determine_alert_level(risk_score: float, rules=None):
+    return (rules or DEFAULT_RULES).alert_level(risk_score)
 
 def should_trigger_alert(existing_alert, new_level):
     if not existing_alert:
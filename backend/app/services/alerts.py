@@ -1,18 +1,18 @@
 from app.utils.logger import get_logger
 from sqlalchemy.orm import Session
 from app.models.alert import Alert
+from app.services.risk_rules import DEFAULT_RULES
 
 logger = get_logger()
 
-CRITICAL_RISK_THRESHOLD = 80
 
-
-def evaluate_alert(risk_score: int) -> bool:
+def evaluate_alert(risk_score: int, rules=None) -> bool:
     """
     PURE FUNCTION
-    Determines whether an alert should be considered
+    Determines whether an alert should be considered: at or above the
+    organization's lowest alert threshold (`rules`, defaults if None)
     """
-    return risk_score >= CRITICAL_RISK_THRESHOLD
+    return (rules or DEFAULT_RULES).alert_level(risk_score) is not None
 
 
 
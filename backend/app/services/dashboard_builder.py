@@ -1,26 +1,167 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
 from app.services.status_mapper import map_status
 from app.services.trends import calculate_trend
-from app.ml.predictor import forecast_risk
+from app.core.config import get_settings
+from app.ml.dataset import load_series
+from app.ml.model import RegressionState
+from app.ml.predictor import cached_forecast, forecast_from_state
 from app.models.risk_history import RiskHistory
+from app.models.source_risk_state import SourceRiskState
+from app.models.water_source import WaterSource
+from app.services.risk_rules import get_rules
+from app.services.rolling_stats import RollingStats
 
+settings = get_settings()
 
-def build_source_dashboard(source, db):
-    history = (
-        db.query(RiskHistory)
-        .filter(RiskHistory.water_source_id == source.id)
-        .order_by(RiskHistory.created_at)
-        .all()
+
+def history_since():
+    """
+    Oldest reading inside FORECAST_HISTORY_DAYS, or None if unbounded
+    """
+    if not settings.forecast_history_days:
+        return None
+    return datetime.utcnow() - timedelta(days=settings.forecast_history_days)
+
+
+def load_history_scores(db, source_id, limit=None, since=None):
+    """
+    The source's newest scores as a NumPy array, oldest -> newest, bounded
+    in SQL by count (`limit`, default FORECAST_HISTORY_LIMIT) and time
+    (`since`, default FORECAST_HISTORY_DAYS).
+    """
+    _, scores = load_series(
+        db,
+        source_id,
+        limit=limit or settings.forecast_history_limit,
+        since=since or history_since()
     )
+    return scores
 
-    recent_scores = [h.risk_score for h in history[-5:]]
-    trend = calculate_trend(recent_scores)
-    forecast = forecast_risk(history)
+
+def source_forecast(db, source_id, latest=None):
+    """
+    Cached forecast: refitted only when the source has a newer reading
+    than the one the cached value was fitted on.
+    `latest` is the source's newest RiskHistory row, if already loaded.
+    With FORECAST_INCREMENTAL it is read from the running regression sums.
+    """
+    if settings.forecast_incremental and settings.forecast_model != "artifact":
+        state = db.get(SourceRiskState, source_id)
+        return forecast_from_state(RegressionState.from_row(state))
+
+    if latest is None:
+        latest = (
+            db.query(RiskHistory.id, RiskHistory.recorded_at)
+            .filter(RiskHistory.water_source_id == source_id)
+            .order_by(RiskHistory.recorded_at.desc(), RiskHistory.id.desc())
+            .first()
+        )
+    if latest is None:
+        return None
+
+    return cached_forecast(
+        source_id,
+        (latest.id, latest.recorded_at),
+        lambda: load_history_scores(db, source_id)
+    )
+
+
+def rolling_summary(row):
+    """
+    Persisted rolling statistics of a SourceRiskState row (None if unscored)
+    """
+    if row is None or row.roll_mean is None:
+        return None
+    return {
+        "ewma": row.ewma,
+        "mean": row.roll_mean,
+        "std": row.roll_std,
+        "slope": row.roll_slope,
+        "min": row.roll_min,
+        "max": row.roll_max
+    }
+
+
+def build_source_dashboard(source, db):
+    state = db.get(SourceRiskState, source.id)
+
+    if state is not None and state.roll_buffer:
+        # trend from the persisted rolling window, no history scan
+        trend = RollingStats.from_row(state).trend()
+        latest = None
+    else:
+        recent = (
+            db.query(RiskHistory)
+            .filter(RiskHistory.water_source_id == source.id)
+            .order_by(RiskHistory.recorded_at.desc(), RiskHistory.id.desc())
+            .limit(5)
+            .all()
+        )
+        trend = calculate_trend([h.risk_score for h in reversed(recent)])
+        latest = recent[0] if recent else None
+
+    forecast = source_forecast(db, source.id, latest)
+    # WaterSource has no score column: the latest one lives in the state
+    risk_score = state.risk_score if state is not None else 0
 
     return {
         "id": source.id,
         "name": source.name,
-        "risk_score": round(source.risk_score, 1),
+        "risk_score": round(risk_score, 1),
         "trend": trend,
         "forecast": round(forecast, 1) if forecast else None,
-        "status": map_status(source.risk_score)
+        "status": map_status(
+            risk_score,
+            get_rules(db, source.organization_id)
+        ),
+        "stats": rolling_summary(state)
     }
+
+
+def build_dashboard_rows(db, organization_id=None, source_ids=None):
+    """
+    Dashboard rows for every source (or `source_ids`) from the
+    materialized latest state: one query, no history scan or model fit
+    per source. Sources that were never scored show as safe / stable.
+    """
+    stmt = (
+        select(
+            WaterSource.id,
+            WaterSource.name,
+            SourceRiskState.risk_score,
+            SourceRiskState.trend,
+            SourceRiskState.forecast,
+            SourceRiskState.status,
+            SourceRiskState.ewma,
+            SourceRiskState.roll_mean,
+            SourceRiskState.roll_std,
+            SourceRiskState.roll_slope,
+            SourceRiskState.roll_min,
+            SourceRiskState.roll_max
+        )
+        .outerjoin(
+            SourceRiskState,
+            SourceRiskState.water_source_id == WaterSource.id
+        )
+        .order_by(WaterSource.id)
+    )
+    if organization_id is not None:
+        stmt = stmt.where(WaterSource.organization_id == organization_id)
+    if source_ids is not None:
+        stmt = stmt.where(WaterSource.id.in_(source_ids))
+
+    return [
+        {
+            "id": row.id,
+            "name": row.name,
+            "risk_score": round(row.risk_score or 0, 1),
+            "trend": row.trend or "stable",
+            "forecast": round(row.forecast, 1) if row.forecast is not None else None,
+            "status": row.status or map_status(row.risk_score or 0),
+            "stats": rolling_summary(row)
+        }
+        for row in db.execute(stmt)
+    ]
@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def lttb(x, y, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of at most `max_points` points
+    that keep the visual shape (peaks and dips) of the series.
+    First and last points are always kept.
+    """
+    n = len(x)
+    if max_points >= n:
+        return np.arange(n)
+    if max_points < 3:
+        return np.array([0, n - 1][:max_points], dtype=np.int64)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # average of the next bucket (or the last point)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    selected[-1] = n - 1
+    return selected
+
+
+def minmax(x, y, max_points: int) -> np.ndarray:
+    """
+    Min/max bucketing: the first and last point plus the lowest and
+    highest point of each of (max_points - 2) // 2 equal-count buckets,
+    in time order. Never drops a peak.
+    """
+    n = len(y)
+    if max_points >= n:
+        return np.arange(n)
+
+    if max_points < 3:
+        return np.array([0, n - 1][:max_points], dtype=np.int64)
+
+    y = np.asarray(y)
+    if max_points == 3:
+        # no room for a bucket pair: endpoints and the overall peak
+        return np.asarray(sorted({0, n - 1, int(np.argmax(y))}), dtype=np.int64)
+
+    buckets = (max_points - 2) // 2
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+
+    selected = {0, n - 1}
+    for start, end in zip(edges[:-1], edges[1:]):
+        if start == end:
+            continue
+        selected.add(start + int(np.argmin(y[start:end])))
+        selected.add(start + int(np.argmax(y[start:end])))
+    return np.asarray(sorted(selected), dtype=np.int64)
+
+
+METHODS = {"lttb": lttb, "minmax": minmax}
+
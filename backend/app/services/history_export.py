@@ -0,0 +1,143 @@
+import csv
+import io
+import json
+
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.models.risk_history import RiskHistory
+
+settings = get_settings()
+
+# same columns app.ml.backtest.series_from_csv reads
+COLUMNS = ("water_source_id", "recorded_at", "risk_score")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream"
+}
+
+
+def export_query(organization_id, source_ids=None, start=None, end=None):
+    stmt = (
+        select(RiskHistory.water_source_id, RiskHistory.recorded_at, RiskHistory.risk_score)
+        .where(RiskHistory.organization_id == organization_id)
+        .order_by(RiskHistory.water_source_id, RiskHistory.recorded_at, RiskHistory.id)
+    )
+    if source_ids:
+        stmt = stmt.where(RiskHistory.water_source_id.in_(source_ids))
+    if start is not None:
+        stmt = stmt.where(RiskHistory.recorded_at >= start)
+    if end is not None:
+        stmt = stmt.where(RiskHistory.recorded_at <= end)
+    return stmt
+
+
+def stream_batches(stmt, batch_size=None):
+    """
+    Rows of `stmt` in lists of `batch_size`, read through a server-side
+    cursor so only one batch is held in memory. Uses its own session: the
+    response body is produced after the request's dependencies are closed.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            stmt.execution_options(yield_per=batch_size or settings.export_batch_size)
+        )
+        for batch in result.partitions():
+            yield batch
+    finally:
+        db.close()
+
+
+def _isoformat(ts):
+    # recorded_at is nullable on older rows
+    return ts.isoformat() if ts is not None else None
+
+
+def _csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield buffer.getvalue().encode()
+
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            (source_id, _isoformat(recorded_at), score)
+            for source_id, recorded_at, score in batch
+        )
+        yield buffer.getvalue().encode()
+
+
+def _ndjson_chunks(batches):
+    for batch in batches:
+        yield "".join(
+            json.dumps({
+                "water_source_id": source_id,
+                "recorded_at": _isoformat(recorded_at),
+                "risk_score": score
+            }) + "\n"
+            for source_id, recorded_at, score in batch
+        ).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write target for the Arrow stream writer, drained after each batch"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _arrow_chunks(batches):
+    import pyarrow as pa
+
+    schema = pa.schema([
+        ("water_source_id", pa.int64()),
+        ("recorded_at", pa.timestamp("us")),
+        ("risk_score", pa.int64())
+    ])
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+ENCODERS = {
+    "csv": _csv_chunks,
+    "ndjson": _ndjson_chunks,
+    "arrow": _arrow_chunks
+}
+
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def export_history(fmt, stmt, batch_size=None):
+    """
+    Encoded `fmt` byte chunks of the rows of `stmt`, one per cursor batch
+    """
+    return ENCODERS[fmt](stream_batches(stmt, batch_size))
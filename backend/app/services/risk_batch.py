@@ -0,0 +1,350 @@
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+# full model registry, so FKs (organizations.id) resolve in any entry point
+import app.models  # noqa: F401
+from app.models.alert import Alert
+from app.models.risk_history import RiskHistory
+from app.models.water_source import WaterSource
+from app.services.risk_rules import get_rules_for_orgs, score_by_organization
+from app.services.rollups import record_rollups
+from app.services.risk_state import (
+    advance_regression,
+    advance_rolling,
+    load_states,
+    upsert_states
+)
+from app.services.environment_simulator import (
+    simulate_rainfall,
+    simulate_water_level
+)
+from app.services.trends import calculate_trend
+from app.services.alert_engine import (
+    determine_alert_level,
+    should_trigger_alert
+)
+from app.ml.predictor import forecast_from_state, forecast_many
+from app.core.config import get_settings
+from app.core.metrics import RunMetrics
+
+TREND_WINDOW = 5
+CRITICAL_FORECAST = 80
+
+settings = get_settings()
+
+
+def recalculation_due(now: datetime):
+    """
+    SQL predicate: sources with new readings or an expired forecast
+    """
+    return or_(
+        WaterSource.needs_recalculation == True,
+        WaterSource.forecast_expires_at == None,
+        WaterSource.forecast_expires_at <= now
+    )
+
+
+def forecast_lookback(history_limit=None):
+    """
+    (limit, since) bounding the history forecasts are fitted on:
+    `history_limit` or FORECAST_HISTORY_LIMIT, and FORECAST_HISTORY_DAYS
+    """
+    since = None
+    if settings.forecast_history_days:
+        since = datetime.utcnow() - timedelta(days=settings.forecast_history_days)
+    return history_limit or settings.forecast_history_limit, since
+
+
+def load_sources(
+    db: Session,
+    source_ids=None,
+    organization_ids=None,
+    due_only=False,
+    after_id=None,
+    limit=None
+):
+    """
+    Loads only the columns the recalculation needs (no ORM identity map).
+    """
+    stmt = select(
+        WaterSource.id,
+        WaterSource.organization_id,
+        WaterSource.rainfall,
+        WaterSource.water_level
+    ).order_by(WaterSource.id)
+
+    if source_ids is not None:
+        stmt = stmt.where(WaterSource.id.in_(source_ids))
+    if organization_ids is not None:
+        stmt = stmt.where(WaterSource.organization_id.in_(organization_ids))
+    if due_only:
+        stmt = stmt.where(recalculation_due(datetime.utcnow()))
+    if after_id is not None:
+        stmt = stmt.where(WaterSource.id > after_id)
+    if limit:
+        stmt = stmt.limit(limit)
+
+    return db.execute(stmt).all()
+
+
+def iter_source_chunks(db: Session, chunk_size=None, after_id=0, **filters):
+    """
+    Streams sources in id order, `chunk_size` at a time (keyset paging).
+    Each chunk is a fresh query, so callers may commit between chunks.
+    """
+    while True:
+        chunk = load_sources(db, after_id=after_id, limit=chunk_size, **filters)
+        if not chunk:
+            return
+
+        yield chunk
+
+        if not chunk_size or len(chunk) < chunk_size:
+            return
+        after_id = chunk[-1].id
+
+
+def load_recent_scores(db: Session, source_ids=None, limit=None, since=None):
+    """
+    Returns {source_id: [scores oldest -> newest]} in ONE query.
+    `limit` keeps only the last N scores per source (ROW_NUMBER window),
+    `since` only scores recorded at or after it.
+    """
+    rn = func.row_number().over(
+        partition_by=RiskHistory.water_source_id,
+        order_by=(RiskHistory.recorded_at.desc(), RiskHistory.id.desc())
+    ).label("rn")
+
+    ranked = select(
+        RiskHistory.water_source_id,
+        RiskHistory.risk_score,
+        rn
+    )
+    if source_ids is not None:
+        ranked = ranked.where(RiskHistory.water_source_id.in_(source_ids))
+    if since is not None:
+        ranked = ranked.where(RiskHistory.recorded_at >= since)
+    ranked = ranked.subquery()
+
+    stmt = select(ranked.c.water_source_id, ranked.c.risk_score)
+    if limit:
+        stmt = stmt.where(ranked.c.rn <= limit)
+    stmt = stmt.order_by(ranked.c.water_source_id, ranked.c.rn.desc())
+
+    scores = {}
+    for source_id, score in db.execute(stmt):
+        scores.setdefault(source_id, []).append(score)
+    return scores
+
+
+def load_open_alerts(db: Session, source_ids=None):
+    """
+    Returns {source_id: latest unacknowledged alert row} in ONE query.
+    """
+    rn = func.row_number().over(
+        partition_by=Alert.water_source_id,
+        order_by=(Alert.created_at.desc(), Alert.id.desc())
+    ).label("rn")
+
+    ranked = select(
+        Alert.water_source_id,
+        Alert.level,
+        Alert.acknowledged,
+        rn
+    ).where(Alert.acknowledged == False)
+    if source_ids is not None:
+        ranked = ranked.where(Alert.water_source_id.in_(source_ids))
+    ranked = ranked.subquery()
+
+    stmt = select(
+        ranked.c.water_source_id,
+        ranked.c.level,
+        ranked.c.acknowledged
+    ).where(ranked.c.rn == 1)
+
+    return {row.water_source_id: row for row in db.execute(stmt)}
+
+
+def recalculate_batch(
+    db: Session,
+    sources,
+    history_limit=None,
+    forecast_ttl_hours=72,
+    metrics: RunMetrics = None
+):
+    """
+    SET-BASED RECALCULATION
+    Loads state for all `sources` up front, decides in memory and
+    writes with bulk statements. Does NOT commit.
+    Query count is constant regardless of len(sources); risk and alert
+    thresholds come from each source's organization rule table.
+    Stage timings and rows written are added to `metrics` if given.
+    With FORECAST_INCREMENTAL, forecasts come from the running regression
+    sums and trends from the rolling window, so no history is loaded.
+    """
+    if not sources:
+        return []
+
+    metrics = metrics or RunMetrics()
+    clock = time.perf_counter
+
+    # a trained model (FORECAST_MODEL=artifact) takes precedence
+    incremental = settings.forecast_incremental and settings.forecast_model != "artifact"
+    history_limit, since = forecast_lookback(history_limit)
+
+    source_ids = [s.id for s in sources]
+    with metrics.stage("state_query"):
+        # locked until the chunk commits: concurrent record_risk calls wait
+        states = load_states(db, source_ids, for_update=True)
+    history = {}
+    if not incremental:
+        with metrics.stage("history_query"):
+            history = load_recent_scores(db, source_ids, limit=history_limit, since=since)
+    with metrics.stage("alert_query"):
+        open_alerts = load_open_alerts(db, source_ids)
+    with metrics.stage("rules"):
+        rules = get_rules_for_orgs(db, {s.organization_id for s in sources})
+
+    now = datetime.utcnow()
+    forecast_expires_at = now + timedelta(hours=forecast_ttl_hours)
+    source_updates = []
+    history_rows = []
+    alert_rows = []
+    state_rows = []
+    outcomes = []
+    trend_time = alert_time = 0.0
+
+    # --- simulate environment ---
+    with metrics.stage("simulate"):
+        rainfall = [simulate_rainfall(s.rainfall) for s in sources]
+        water_level = [simulate_water_level(s.water_level) for s in sources]
+
+    # --- calculate risk (one vectorized pass per organization) ---
+    with metrics.stage("risk"):
+        risks = score_by_organization(
+            [s.organization_id for s in sources],
+            rainfall,
+            water_level,
+            rules
+        ).tolist()
+
+    # history + the score we are about to write, per source
+    series = [history.get(s.id, []) + [risks[i]] for i, s in enumerate(sources)]
+
+    # --- rolling statistics (O(1) per source) ---
+    with metrics.stage("rolling"):
+        rollings = [
+            advance_rolling(states.get(s.id), risks[i])
+            for i, s in enumerate(sources)
+        ]
+
+    # --- forecasting (one vectorized solve for all sources) ---
+    with metrics.stage("forecast"):
+        regressions = [
+            advance_regression(states.get(s.id), risks[i])
+            for i, s in enumerate(sources)
+        ]
+        if incremental:
+            forecasts = [forecast_from_state(r) for r in regressions]
+        else:
+            forecasts = forecast_many(series, source_ids)
+
+    for i, source in enumerate(sources):
+        t0 = clock()
+        risk = risks[i]
+
+        source_updates.append({
+            "id": source.id,
+            "rainfall": rainfall[i],
+            "water_level": water_level[i],
+            "last_updated": now,
+            "needs_recalculation": False,
+            "forecast_expires_at": forecast_expires_at
+        })
+        history_rows.append({
+            "water_source_id": source.id,
+            "organization_id": source.organization_id,
+            "risk_score": risk,
+            "recorded_at": now
+        })
+
+        # --- trend analysis ---
+        if incremental:
+            trend = rollings[i].trend()
+        else:
+            trend = calculate_trend(series[i][-TREND_WINDOW:])
+        t1 = clock()
+
+        # --- alerting ---
+        level = determine_alert_level(risk, rules[source.organization_id])
+        if level and should_trigger_alert(open_alerts.get(source.id), level):
+            alert_rows.append({
+                "water_source_id": source.id,
+                "organization_id": source.organization_id,
+                "level": level,
+                "message": f"Risk is {level.upper()} ({risk})",
+                "acknowledged": False,
+                "created_at": now
+            })
+        else:
+            level = None
+        t2 = clock()
+
+        forecast = forecasts[i]
+        trend_time += t1 - t0
+        alert_time += t2 - t1
+
+        state_rows.append({
+            "water_source_id": source.id,
+            "organization_id": source.organization_id,
+            "risk_score": risk,
+            "status": rules[source.organization_id].status(risk),
+            "trend": trend,
+            "forecast": forecast,
+            "recorded_at": now,
+            **regressions[i].as_columns(),
+            **rollings[i].as_columns()
+        })
+        outcomes.append({
+            "source_id": source.id,
+            "organization_id": source.organization_id,
+            "risk": risk,
+            "trend": trend,
+            "forecast": forecast,
+            "alert_level": level
+        })
+
+    metrics.add_time("trend", trend_time)
+    metrics.add_time("alert", alert_time)
+
+    with metrics.stage("write"):
+        db.execute(update(WaterSource), source_updates)
+        db.execute(insert(RiskHistory), history_rows)
+        if alert_rows:
+            db.execute(insert(Alert), alert_rows)
+        upsert_states(db, state_rows)
+        rollup_rows = record_rollups(db, history_rows)
+
+    metrics.add_rows("water_sources", len(source_updates))
+    metrics.add_rows("risk_history", len(history_rows))
+    metrics.add_rows("source_risk_states", len(state_rows))
+    metrics.add_rows("risk_rollups", rollup_rows)
+    metrics.add_rows("alerts", len(alert_rows))
+
+    return outcomes
+
+
+def summarize(outcomes):
+    critical = [
+        o for o in outcomes
+        if o["forecast"] and o["forecast"] >= CRITICAL_FORECAST
+    ]
+    return {
+        "sources": len(outcomes),
+        "history_rows": len(outcomes),
+        "alerts": sum(1 for o in outcomes if o["alert_level"]),
+        "critical_forecasts": [o["source_id"] for o in critical]
+    }
@@ -1,67 +1,176 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.models.risk_history import RiskHistory
+from app.models.water_source import WaterSource
 from app.realtime.broadcaster import broadcast_risk_update
-from app.services.dashboard_builder import build_source_dashboard
+from app.services.dashboard_builder import (
+    build_dashboard_rows,
+    build_source_dashboard,
+    source_forecast
+)
 from app.explainability.engine import explain_risk
 from app.services.trends import calculate_trend
 from app.services.alerts import evaluate_alert, create_or_update_alert
 from app.services.alert_engine import determine_alert_level
+from app.services.risk_rules import DEFAULT_RULES, get_rules
+from app.services.risk_state import record_risk, upsert_states
+
+settings = get_settings()
 
 
-def calculate_risk(rainfall: float, water_level: float) -> int:
+def calculate_risk(rainfall: float, water_level: float, rules=None) -> int:
     """
     PURE FUNCTION
     No DB
     No side effects
+    `rules` is an organization's CompiledRiskRules (defaults if None)
     """
-    risk = 0
-
-    if rainfall < 50:
-        risk += 40
-    if water_level < 20:
-        risk += 60
-
-    return min(risk, 100)
+    return (rules or DEFAULT_RULES).score(rainfall, water_level)
 
 
-async def update_risk(source, new_score: int, db):
+def calculate_risk_batch(rainfall, water_level, rules=None) -> np.ndarray:
     """
-    ORCHESTRATION FUNCTION
-    Coordinates everything AFTER risk changes
+    PURE FUNCTION
+    Vectorized calculate_risk: array-likes in, int array of scores out,
+    element-wise identical to the scalar version
     """
+    return (rules or DEFAULT_RULES).score_batch(rainfall, water_level)
 
-    # 1️⃣ Persist risk
-    source.risk_score = new_score
-    db.commit()
 
-    # 2️⃣ Calculate trend (from history)
-    recent_scores = [
-        r.risk_score for r in source.risk_history[-5:]
-    ]
-    trend = calculate_trend(recent_scores)
+def _persist_score(source_id: int, organization_id: int, new_score: int):
+    """
+    BLOCKING: runs in the risk-update pool with its own session.
+    The score, rolling trend and (unrounded) forecast land in one
+    transaction. Returns the source's stored dashboard row.
+    """
+    db = SessionLocal()
+    try:
+        record_risk(
+            db,
+            source_id,
+            organization_id,
+            new_score,
+            get_rules(db, organization_id)
+        )
+        # the forecast fit must see the new reading
+        db.flush()
+        upsert_states(db, [{
+            "water_source_id": source_id,
+            "organization_id": organization_id,
+            "forecast": source_forecast(db, source_id)
+        }])
+        db.commit()
+        return build_dashboard_rows(db, source_ids=[source_id])[0]
+    finally:
+        db.close()
 
-    # 3️⃣ Generate explanation (THIS IS STEP 6)
-    explanation = explain_risk(
-        source=source,
-        risk_score=new_score,
-        trend=trend
-    )
 
+def _evaluate_and_build(source_id: int, new_score: int):
+    """
+    BLOCKING: trend, explanation, alerting and the dashboard payload
+    (history query + forecast fit). Own session, runs in the pool.
+    """
+    db = SessionLocal()
+    try:
+        source = db.get(WaterSource, source_id)
 
-    if evaluate_alert(new_score):
-        level = determine_alert_level(new_score)
+        # 2️⃣ Calculate trend (from history)
+        recent = (
+            db.query(RiskHistory.risk_score)
+            .filter(RiskHistory.water_source_id == source_id)
+            .order_by(RiskHistory.recorded_at.desc(), RiskHistory.id.desc())
+            .limit(5)
+            .all()
+        )
+        trend = calculate_trend([r[0] for r in reversed(recent)])
 
-        create_or_update_alert(
-            db=db,
+        # 3️⃣ Generate explanation (THIS IS STEP 6)
+        explanation = explain_risk(
             source=source,
             risk_score=new_score,
-            level=level
+            trend=trend
         )
 
-    # (optional) persist explanation later
-    # db.add(RiskExplanationModel(...))
+        rules = get_rules(db, source.organization_id)
+        if evaluate_alert(new_score, rules):
+            level = determine_alert_level(new_score, rules)
+
+            if level:
+                create_or_update_alert(
+                    db=db,
+                    source=source,
+                    risk_score=new_score,
+                    level=level
+                )
+
+        # (optional) persist explanation later
+        # db.add(RiskExplanationModel(...))
+
+        # 4️⃣ Build dashboard payload
+        payload = build_source_dashboard(source, db)
+        db.commit()
+
+        payload["explanation"] = explanation.dict()
+        return payload
+    finally:
+        db.close()
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.risk_update_workers,
+    thread_name_prefix="risk-update"
+)
+_semaphore = None
+
+
+def start_risk_updates():
+    """
+    Creates the in-flight limit. Called from the app's startup, inside the
+    event loop that serves update_risk.
+    """
+    global _semaphore
+    _semaphore = asyncio.Semaphore(settings.risk_update_concurrency)
+
+
+def _in_flight():
+    if _semaphore is None:
+        raise RuntimeError("start_risk_updates() was not called")
+    return _semaphore
+
+
+async def _offload(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args))
+
+
+async def update_risk(source, new_score: int):
+    """
+    ORCHESTRATION FUNCTION
+    Coordinates everything AFTER risk changes.
+    Blocking DB/CPU stages run in a bounded thread pool (each with its own
+    session), so the event loop keeps serving requests and websockets.
+    At most RISK_UPDATE_CONCURRENCY updates are in flight at once.
+    """
+    # read ids up front: no lazy loads on the event loop
+    source_id = source.id
+    organization_id = source.organization_id
+
+    async with _in_flight():
+        # 1️⃣ Persist risk
+        row = await _offload(_persist_score, source_id, organization_id, new_score)
+
+        # 5️⃣ Broadcast the new score as soon as it is stored (a full row:
+        # clients replace the source with `data`)
+        await broadcast_risk_update(source_id, row)
 
-    # 4️⃣ Build dashboard payload
-    payload = build_source_dashboard(source, db)
-    payload["explanation"] = explanation.dict()
+        # 2️⃣-4️⃣ trend, explanation, alerting, dashboard payload
+        payload = await _offload(_evaluate_and_build, source_id, new_score)
 
-    # 5️⃣ Broadcast realtime update
-    await broadcast_risk_update(source.id, payload)
+    # the complete row (fresh forecast, explanation) follows
+    await broadcast_risk_update(source_id, payload)
@@ -0,0 +1,179 @@
+import threading
+import time
+from bisect import bisect_right
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.risk_rule_set import RiskRuleSet
+
+settings = get_settings()
+
+ALERT_LEVELS = (None, "medium", "high", "critical")
+STATUSES = ("safe", "moderate", "high", "critical")
+
+
+class CompiledRiskRules:
+    """
+    Immutable, precompiled form of one organization's rule table.
+    Scalar methods use plain comparisons/bisect, *_batch methods are
+    vectorized with NumPy; both give identical results.
+    """
+
+    __slots__ = (
+        "rainfall_threshold",
+        "rainfall_points",
+        "water_level_threshold",
+        "water_level_points",
+        "alert_bins",
+        "status_bins",
+        "version"
+    )
+
+    def __init__(
+        self,
+        rainfall_threshold=50.0,
+        rainfall_points=40,
+        water_level_threshold=20.0,
+        water_level_points=60,
+        alert_bins=(40, 65, 85),
+        status_bins=(30, 60, 80),
+        version=0
+    ):
+        self.rainfall_threshold = rainfall_threshold
+        self.rainfall_points = rainfall_points
+        self.water_level_threshold = water_level_threshold
+        self.water_level_points = water_level_points
+        self.alert_bins = tuple(alert_bins)
+        self.status_bins = tuple(status_bins)
+        self.version = version
+
+    @classmethod
+    def from_row(cls, row: RiskRuleSet):
+        return cls(
+            rainfall_threshold=row.rainfall_threshold,
+            rainfall_points=row.rainfall_points,
+            water_level_threshold=row.water_level_threshold,
+            water_level_points=row.water_level_points,
+            alert_bins=(row.alert_medium, row.alert_high, row.alert_critical),
+            status_bins=(row.status_moderate, row.status_high, row.status_critical),
+            version=row.version
+        )
+
+    def score(self, rainfall: float, water_level: float) -> int:
+        risk = 0
+
+        if rainfall < self.rainfall_threshold:
+            risk += self.rainfall_points
+        if water_level < self.water_level_threshold:
+            risk += self.water_level_points
+
+        return min(risk, 100)
+
+    def score_batch(self, rainfall, water_level) -> np.ndarray:
+        rainfall = np.asarray(rainfall, dtype=float)
+        water_level = np.asarray(water_level, dtype=float)
+
+        risk = (
+            np.where(rainfall < self.rainfall_threshold, self.rainfall_points, 0)
+            + np.where(water_level < self.water_level_threshold, self.water_level_points, 0)
+        )
+
+        return np.minimum(risk, 100)
+
+    def alert_level(self, score: float):
+        return ALERT_LEVELS[bisect_right(self.alert_bins, score)]
+
+    def status(self, score: float) -> str:
+        return STATUSES[bisect_right(self.status_bins, score)]
+
+
+DEFAULT_RULES = CompiledRiskRules()
+
+# organization_id -> (loaded_at, CompiledRiskRules)
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _load(db: Session, organization_ids):
+    rows = (
+        db.query(RiskRuleSet)
+        .filter(RiskRuleSet.organization_id.in_(organization_ids))
+        .all()
+    )
+    by_org = {row.organization_id: row for row in rows}
+    now = time.monotonic()
+
+    loaded = {}
+    with _cache_lock:
+        for org_id in organization_ids:
+            row = by_org.get(org_id)
+            cached = _cache.get(org_id)
+
+            if row is None:
+                rules = DEFAULT_RULES
+            elif cached and cached[1].version == row.version:
+                rules = cached[1]  # unchanged, skip recompiling
+            else:
+                rules = CompiledRiskRules.from_row(row)
+
+            _cache[org_id] = (now, rules)
+            loaded[org_id] = rules
+
+    return loaded
+
+
+def get_rules_for_orgs(db: Session, organization_ids) -> dict:
+    """
+    {organization_id: CompiledRiskRules}. Cached in memory; entries older
+    than RISK_RULES_CACHE_SECONDS are re-read in one query, so changes made by other
+    processes show up within that window.
+    """
+    now = time.monotonic()
+    rules = {}
+    stale = []
+
+    for org_id in set(organization_ids):
+        cached = _cache.get(org_id)
+        if cached and now - cached[0] < settings.risk_rules_cache_seconds:
+            rules[org_id] = cached[1]
+        else:
+            stale.append(org_id)
+
+    if stale:
+        rules.update(_load(db, stale))
+
+    return rules
+
+
+def get_rules(db: Session, organization_id) -> CompiledRiskRules:
+    if organization_id is None:
+        return DEFAULT_RULES
+    return get_rules_for_orgs(db, [organization_id])[organization_id]
+
+
+def invalidate_rules(organization_id=None):
+    with _cache_lock:
+        if organization_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(organization_id, None)
+
+
+def score_by_organization(organization_ids, rainfall, water_level, rules_by_org) -> np.ndarray:
+    """
+    Vectorized scoring of a mixed-organization batch: one NumPy pass per
+    organization present in the batch
+    """
+    organization_ids = np.asarray(organization_ids)
+    rainfall = np.asarray(rainfall, dtype=float)
+    water_level = np.asarray(water_level, dtype=float)
+    risks = np.zeros(len(organization_ids), dtype=int)
+
+    for org_id, rules in rules_by_org.items():
+        mask = organization_ids == org_id
+        if mask.any():
+            risks[mask] = rules.score_batch(rainfall[mask], water_level[mask])
+
+    return risks
@@ -0,0 +1,132 @@
+from datetime import datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.ml.model import RegressionState
+from app.models.risk_history import RiskHistory
+from app.models.source_risk_state import SourceRiskState
+from app.services.risk_rules import DEFAULT_RULES
+from app.services.rolling_stats import RollingStats
+from app.services.rollups import record_rollups
+
+settings = get_settings()
+
+
+def load_states(db: Session, source_ids, for_update=False):
+    """
+    Returns {source_id: SourceRiskState row} in ONE query (no ORM objects).
+    Writers that advance the running sums from these rows pass
+    `for_update`: the rows stay locked until the caller's transaction
+    ends, so concurrent writers on a source queue up instead of each
+    advancing the same old state and losing an observation.
+    """
+    stmt = select(*SourceRiskState.__table__.c).where(
+        SourceRiskState.water_source_id.in_(source_ids)
+    )
+
+    if for_update:
+        if db.get_bind().dialect.name == "sqlite":
+            # no row locks: a no-op write takes SQLite's database write
+            # lock before the read instead
+            db.execute(
+                update(SourceRiskState)
+                .where(SourceRiskState.water_source_id.in_(source_ids))
+                .values(water_source_id=SourceRiskState.water_source_id)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            stmt = stmt.with_for_update()
+
+    return {row.water_source_id: row for row in db.execute(stmt)}
+
+
+def advance_regression(state_row, score) -> RegressionState:
+    """
+    Running regression sums of `state_row` with `score` appended
+    """
+    return RegressionState.from_row(state_row).update(score, settings.forecast_decay)
+
+
+def advance_rolling(state_row, score) -> RollingStats:
+    """
+    Rolling statistics of `state_row` with `score` appended
+    """
+    return RollingStats.from_row(state_row).update(score)
+
+
+def upsert_states(db: Session, rows):
+    """
+    Bulk insert-or-update of SourceRiskState rows (dicts keyed by column).
+    Only the keys present in the rows are overwritten, so e.g. a
+    score-only update keeps the stored trend and forecast.
+    Does NOT commit.
+    """
+    if not rows:
+        return
+
+    columns = [c for c in rows[0] if c != "water_source_id"]
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        stmt = sqlite_insert(SourceRiskState)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["water_source_id"],
+            set_={c: stmt.excluded[c] for c in columns}
+        )
+        db.execute(stmt, rows)
+    elif dialect == "mysql":
+        stmt = mysql_insert(SourceRiskState)
+        stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in columns})
+        db.execute(stmt, rows)
+    else:
+        for row in rows:
+            db.merge(SourceRiskState(**row))
+
+
+def record_risk(
+    db: Session,
+    source_id: int,
+    organization_id: int,
+    risk_score: int,
+    rules=None,
+    trend: str = None,
+    forecast: float = None,
+    recorded_at: datetime = None
+):
+    """
+    Writes one RiskHistory row, its rollup buckets and the matching latest
+    state, including the running regression sums and rolling statistics
+    (which also give the trend unless one is passed). Does NOT commit:
+    everything lands in the caller's transaction.
+    """
+    recorded_at = recorded_at or datetime.utcnow()
+
+    history = {
+        "water_source_id": source_id,
+        "organization_id": organization_id,
+        "risk_score": risk_score,
+        "recorded_at": recorded_at
+    }
+    db.add(RiskHistory(**history))
+    record_rollups(db, [history])
+
+    previous = load_states(db, [source_id], for_update=True).get(source_id)
+    rolling = advance_rolling(previous, risk_score)
+    state = {
+        "water_source_id": source_id,
+        "organization_id": organization_id,
+        "risk_score": risk_score,
+        "status": (rules or DEFAULT_RULES).status(risk_score),
+        "recorded_at": recorded_at,
+        "trend": trend or rolling.trend(),
+        **advance_regression(previous, risk_score).as_columns(),
+        **rolling.as_columns()
+    }
+    if forecast is not None:
+        state["forecast"] = forecast
+
+    upsert_states(db, [state])
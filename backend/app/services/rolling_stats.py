@@ -0,0 +1,200 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.trends import calculate_trend
+
+settings = get_settings()
+
+
+def _monotonic(values, beats, accumulate):
+    """
+    The (seq, value) entries a monotonic min/max deque holds after pushing
+    `values`: each score that `beats` every later one, oldest first
+    """
+    if not len(values):
+        return deque()
+    rest = accumulate(values[::-1])[::-1]  # extreme of values[i:]
+    keep = np.append(beats(values[:-1], rest[1:]), True)
+    idx = np.flatnonzero(keep)
+    return deque(zip(idx.tolist(), values[idx].tolist()))
+
+
+class RollingStats:
+    """
+    Rolling statistics of one source's last `window` scores, held in a ring
+    buffer. update() is O(1): running sums give mean/std and the
+    least-squares slope, monotonic deques give min/max, plus an EWMA over
+    all scores. Persisted in source_risk_states (see as_columns/from_row),
+    running sums included, so loading does not replay the window.
+    """
+
+    def __init__(self, window=None, alpha=None, values=(), ewma=None):
+        self.window = window or settings.rolling_window
+        self.alpha = alpha or settings.rolling_ewma_alpha
+        self.ewma = ewma
+
+        self.buffer = np.zeros(self.window)
+        self.head = 0  # next write position
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        # regression sums, x re-based so the newest score sits at x = 0
+        self.sx = 0.0
+        self.sxy = 0.0
+        self.sxx = 0.0
+        self._seq = 0
+        self._min = deque()  # (seq, value), increasing values
+        self._max = deque()  # (seq, value), decreasing values
+
+        for value in values:
+            self._push(float(value))
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        From a SourceRiskState row (roll_* columns); empty if never scored.
+        The persisted sums are loaded as they are; they are recomputed only
+        for rows written before they existed, or when a smaller
+        ROLLING_WINDOW drops the oldest scores.
+        """
+        if row is None or not row.roll_buffer:
+            return cls()
+        values = np.frombuffer(row.roll_buffer, dtype=np.float32).astype(np.float64)
+        if row.roll_sum is None or len(values) > settings.rolling_window:
+            return cls(values=values[-(settings.rolling_window):], ewma=row.ewma)
+
+        stats = cls(ewma=row.ewma)
+        stats._restore(values, row.roll_sum, row.roll_sum_sq, row.roll_sum_xy)
+        return stats
+
+    def _restore(self, values, total, total_sq, sxy):
+        n = len(values)
+        self.buffer[:n] = values
+        self.head = n % self.window
+        self.count = n
+        self.total = total
+        self.total_sq = total_sq
+        self.sxy = sxy
+        # x runs -(n - 1) .. 0, so these follow from n alone
+        self.sx = -n * (n - 1) / 2
+        self.sxx = (n - 1) * n * (2 * n - 1) / 6
+        self._seq = n
+        self._max = _monotonic(values, np.greater, np.maximum.accumulate)
+        self._min = _monotonic(values, np.less, np.minimum.accumulate)
+
+    def update(self, score: float):
+        score = float(score)
+        if self.ewma is None:
+            self.ewma = score
+        else:
+            self.ewma = self.alpha * score + (1 - self.alpha) * self.ewma
+        self._push(score)
+        return self
+
+    def _push(self, y):
+        n = self.count
+
+        # shift existing points one step into the past (x -> x - 1)
+        self.sxx += n - 2 * self.sx
+        self.sxy -= self.total
+        self.sx -= n
+
+        if n == self.window:
+            # evict the oldest score, now at x = -window
+            old = self.buffer[self.head]
+            x = -self.window
+            self.total -= old
+            self.total_sq -= old * old
+            self.sx -= x
+            self.sxy -= x * old
+            self.sxx -= x * x
+        else:
+            self.count += 1
+
+        self.buffer[self.head] = y
+        self.head = (self.head + 1) % self.window
+        self.total += y
+        self.total_sq += y * y
+
+        seq = self._seq
+        self._seq += 1
+        while self._max and self._max[-1][1] <= y:
+            self._max.pop()
+        self._max.append((seq, y))
+        while self._min and self._min[-1][1] >= y:
+            self._min.pop()
+        self._min.append((seq, y))
+        for window_deque in (self._max, self._min):
+            while window_deque[0][0] <= seq - self.window:
+                window_deque.popleft()
+
+    def values(self) -> np.ndarray:
+        """
+        Scores in the window, oldest -> newest
+        """
+        if self.count < self.window:
+            return self.buffer[:self.count].copy()
+        return np.roll(self.buffer, -self.head)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    @property
+    def std(self):
+        if not self.count:
+            return None
+        variance = self.total_sq / self.count - self.mean ** 2
+        return math.sqrt(max(variance, 0.0))
+
+    @property
+    def slope(self):
+        """
+        Least-squares change per reading over the window
+        """
+        denominator = self.count * self.sxx - self.sx * self.sx
+        if self.count < 2 or abs(denominator) < 1e-9:
+            return 0.0
+        return (self.count * self.sxy - self.sx * self.total) / denominator
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else None
+
+    def trend(self) -> str:
+        """
+        Same rule as calculate_trend on the source's recent scores
+        """
+        return calculate_trend(self.values()[-3:].tolist())
+
+    def summary(self) -> dict:
+        return {
+            "window": self.count,
+            "ewma": self.ewma,
+            "mean": self.mean,
+            "std": self.std,
+            "slope": self.slope,
+            "min": self.min,
+            "max": self.max
+        }
+
+    def as_columns(self) -> dict:
+        return {
+            "roll_buffer": self.values().astype(np.float32).tobytes(),
+            "ewma": self.ewma,
+            "roll_mean": self.mean,
+            "roll_std": self.std,
+            "roll_slope": self.slope,
+            "roll_min": self.min,
+            "roll_max": self.max,
+            "roll_sum": self.total,
+            "roll_sum_sq": self.total_sq,
+            "roll_sum_xy": self.sxy
+        }
@@ -0,0 +1,195 @@
+from datetime import datetime
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.risk_history import RiskHistory
+from app.models.risk_rollup import RiskRollup
+
+GRANULARITIES = ("hour", "day", "month")
+
+# nominal bucket width, used to pick a rollup for a requested resolution
+BUCKET_SECONDS = {
+    "hour": 3600,
+    "day": 86400,
+    "month": 30 * 86400
+}
+
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def aggregate(history_rows):
+    """
+    Folds RiskHistory-shaped dicts (water_source_id, organization_id,
+    risk_score, recorded_at) into one rollup row per source and bucket
+    """
+    buckets = {}
+    for row in history_rows:
+        score = float(row["risk_score"])
+        recorded_at = row["recorded_at"]
+        for granularity in GRANULARITIES:
+            key = (row["water_source_id"], granularity, bucket_start(recorded_at, granularity))
+            b = buckets.get(key)
+            if b is None:
+                buckets[key] = {
+                    "water_source_id": key[0],
+                    "granularity": granularity,
+                    "bucket_start": key[2],
+                    "organization_id": row["organization_id"],
+                    "readings": 1,
+                    "total": score,
+                    "min_score": score,
+                    "max_score": score,
+                    "last_score": score,
+                    "last_at": recorded_at
+                }
+                continue
+            b["readings"] += 1
+            b["total"] += score
+            b["min_score"] = min(b["min_score"], score)
+            b["max_score"] = max(b["max_score"], score)
+            if recorded_at >= b["last_at"]:
+                b["last_score"], b["last_at"] = score, recorded_at
+    return list(buckets.values())
+
+
+def _merge_statement(dialect: str):
+    """
+    INSERT ... ON CONFLICT/DUPLICATE KEY that adds into an existing bucket
+    """
+    table = RiskRollup.__table__
+
+    if dialect == "mysql":
+        stmt = mysql_insert(RiskRollup)
+        new, least, greatest = stmt.inserted, func.least, func.greatest
+    elif dialect == "postgresql":
+        stmt = pg_insert(RiskRollup)
+        new, least, greatest = stmt.excluded, func.least, func.greatest
+    else:
+        # SQLite: two-argument min()/max() are scalar functions
+        stmt = sqlite_insert(RiskRollup)
+        new, least, greatest = stmt.excluded, func.min, func.max
+
+    values = {
+        "readings": table.c.readings + new.readings,
+        "total": table.c.total + new.total,
+        "min_score": least(table.c.min_score, new.min_score),
+        "max_score": greatest(table.c.max_score, new.max_score),
+        "last_score": case(
+            (new.last_at >= table.c.last_at, new.last_score),
+            else_=table.c.last_score
+        ),
+        "last_at": greatest(table.c.last_at, new.last_at)
+    }
+
+    if dialect == "mysql":
+        return stmt.on_duplicate_key_update(values)
+    return stmt.on_conflict_do_update(
+        index_elements=["water_source_id", "granularity", "bucket_start"],
+        set_=values
+    )
+
+
+def record_rollups(db: Session, history_rows):
+    """
+    Adds freshly written RiskHistory rows (dicts) to their hour, day and
+    month buckets. Call in the same transaction as the history insert.
+    Does NOT commit.
+    """
+    rows = aggregate(history_rows)
+    if rows:
+        db.execute(_merge_statement(db.get_bind().dialect.name), rows)
+    return len(rows)
+
+
+def replace_rollups(db: Session, source_ids, history_rows):
+    """
+    Backfill: drops the rollups of `source_ids` and rebuilds them from
+    their complete `history_rows` (which may stream from an open cursor:
+    it is consumed before anything else runs). Does NOT commit.
+    """
+    rows = aggregate(history_rows)
+    db.execute(delete(RiskRollup).where(RiskRollup.water_source_id.in_(source_ids)))
+    if rows:
+        db.execute(insert(RiskRollup), rows)
+    return len(rows)
+
+
+def bucket_count(start: datetime, end: datetime, granularity: str) -> int:
+    """
+    Number of `granularity` buckets that [start, end] touches
+    """
+    first, last = bucket_start(start, granularity), bucket_start(end, granularity)
+    if granularity == "month":
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return int((last - first).total_seconds() // BUCKET_SECONDS[granularity]) + 1
+
+
+def choose_granularity(start: datetime, end: datetime, max_points: int, resolution_seconds=None):
+    """
+    Finest rollup with at most `max_points` buckets over [start, end] (and
+    buckets no wider than `resolution_seconds`, if given). When none fits,
+    the widest acceptable one: the caller downsamples its buckets.
+    None means raw history: a resolution under an hour was requested or,
+    by default, fewer than `max_points` hours span the range (the raw
+    readings then show more than hourly buckets could).
+    """
+    if resolution_seconds is None:
+        if bucket_count(start, end, "hour") < max_points:
+            return None
+        candidates = GRANULARITIES
+    else:
+        candidates = [g for g in GRANULARITIES if BUCKET_SECONDS[g] <= resolution_seconds]
+        if not candidates:
+            return None
+
+    for granularity in candidates:
+        if bucket_count(start, end, granularity) <= max_points:
+            return granularity
+    return candidates[-1]
+
+
+def load_rollups(db: Session, source_id, granularity, start=None, end=None):
+    stmt = (
+        select(RiskRollup)
+        .where(
+            RiskRollup.water_source_id == source_id,
+            RiskRollup.granularity == granularity
+        )
+        .order_by(RiskRollup.bucket_start)
+    )
+    if start is not None:
+        stmt = stmt.where(RiskRollup.bucket_start >= bucket_start(start, granularity))
+    if end is not None:
+        stmt = stmt.where(RiskRollup.bucket_start <= end)
+    return db.execute(stmt).scalars().all()
+
+
+def first_reading_at(db: Session, source_id):
+    """
+    Start of the hour of the source's first reading, from the hour rollups
+    (an index seek); from risk_history if they were never backfilled
+    """
+    first = db.execute(
+        select(func.min(RiskRollup.bucket_start)).where(
+            RiskRollup.water_source_id == source_id,
+            RiskRollup.granularity == "hour"
+        )
+    ).scalar()
+    if first is not None:
+        return first
+
+    return db.execute(
+        select(func.min(RiskHistory.recorded_at)).where(
+            RiskHistory.water_source_id == source_id
+        )
+    ).scalar()
@@ -0,0 +1,143 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.recalculation_run import RecalculationRun
+
+UNFINISHED = ("running", "failed", "resume_requested")
+# full recalculation passes (adaptive rounds only cover due sources)
+FULL_RUN_MODES = ("batch", "sharded", "legacy")
+
+
+def find_interrupted_run(db: Session, resume_window_hours: int):
+    """
+    Latest run that never completed and is still recent enough to resume.
+    Older unfinished runs are marked abandoned.
+    """
+    run = (
+        db.query(RecalculationRun)
+        .filter(RecalculationRun.mode == "batch")
+        .order_by(RecalculationRun.id.desc())
+        .first()
+    )
+
+    if not run or run.status not in UNFINISHED:
+        return None
+
+    if run.started_at < datetime.utcnow() - timedelta(hours=resume_window_hours):
+        run.status = "abandoned"
+        run.finished_at = datetime.utcnow()
+        db.commit()
+        return None
+
+    return run
+
+
+def last_completed_run(db: Session, since: datetime, modes=FULL_RUN_MODES):
+    """
+    Latest full recalculation that started at or after `since` and completed
+    """
+    return (
+        db.query(RecalculationRun)
+        .filter(
+            RecalculationRun.mode.in_(modes),
+            RecalculationRun.status == "completed",
+            RecalculationRun.started_at >= since
+        )
+        .order_by(RecalculationRun.id.desc())
+        .first()
+    )
+
+
+def start_or_resume_run(db: Session, resume_window_hours: int):
+    run = find_interrupted_run(db, resume_window_hours)
+
+    if run:
+        run.status = "running"
+        run.attempts += 1
+        run.error = None
+    else:
+        run = RecalculationRun(
+            mode="batch",
+            status="running",
+            last_source_id=0,
+            sources_processed=0
+        )
+        db.add(run)
+
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def request_resume(db: Session, run: RecalculationRun):
+    """
+    Manual trigger: the scheduler's poll job resumes the run
+    """
+    run.status = "resume_requested"
+    db.commit()
+
+
+def is_resume_requested(db: Session) -> bool:
+    latest = (
+        db.query(RecalculationRun.status)
+        .filter(RecalculationRun.mode == "batch")
+        .order_by(RecalculationRun.id.desc())
+        .first()
+    )
+    return bool(latest) and latest.status == "resume_requested"
+
+
+def checkpoint(db: Session, run_id: int, last_source_id: int, sources_processed: int):
+    """
+    Call INSIDE the chunk's transaction so the checkpoint commits
+    atomically with the chunk's writes.
+    """
+    db.execute(
+        update(RecalculationRun)
+        .where(RecalculationRun.id == run_id)
+        .values(
+            last_source_id=last_source_id,
+            sources_processed=sources_processed
+        )
+    )
+
+
+def finish_run(db: Session, run_id: int, status: str, error: str = None, metrics: dict = None):
+    db.execute(
+        update(RecalculationRun)
+        .where(RecalculationRun.id == run_id)
+        .values(
+            status=status,
+            finished_at=datetime.utcnow(),
+            error=error[:255] if error else None,
+            metrics=json.dumps(metrics) if metrics else None
+        )
+    )
+    db.commit()
+
+
+def record_run(
+    db: Session,
+    mode: str,
+    status: str,
+    started_at: datetime,
+    sources_processed: int,
+    metrics: dict,
+    error: str = None
+):
+    """
+    Ledger entry for runs that are not checkpointed (sharded, adaptive)
+    """
+    db.add(RecalculationRun(
+        mode=mode,
+        status=status,
+        started_at=started_at,
+        finished_at=datetime.utcnow(),
+        sources_processed=sources_processed,
+        error=error[:255] if error else None,
+        metrics=json.dumps(metrics)
+    ))
+    db.commit()
@@ -1,8 +1,5 @@
-def map_status(risk: float):
-    if risk >= 80:
-        return "critical"
-    elif risk >= 60:
-        return "high"
-    elif risk >= 30:
-        return "moderate"
-    return "safe"
+from app.services.risk_rules import DEFAULT_RULES
+
+
+def map_status(risk: float, rules=None):
+    return (rules or DEFAULT_RULES).status(risk)
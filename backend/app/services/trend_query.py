@@ -0,0 +1,67 @@
+from sqlalchemy import case, func, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.risk_history import RiskHistory
+
+# calculate_trend: latest score vs. the score two readings before it
+TREND_LAG = 2
+TREND_DELTA = 10
+
+
+def load_trend_rows(db: Session, organization_id=None, source_ids=None):
+    """
+    Latest score and trend of every matching source in ONE statement:
+    ROW_NUMBER picks each source's newest reading and LAG the one two
+    readings earlier; the rising/falling/stable label is computed in SQL
+    with the same thresholds as calculate_trend.
+    Rows: (water_source_id, risk_score, trend). Sources without history
+    are absent.
+    """
+    order = (RiskHistory.recorded_at, RiskHistory.id)
+    previous = func.lag(RiskHistory.risk_score, TREND_LAG).over(
+        partition_by=RiskHistory.water_source_id,
+        order_by=order
+    ).label("previous")
+    rn = func.row_number().over(
+        partition_by=RiskHistory.water_source_id,
+        order_by=(RiskHistory.recorded_at.desc(), RiskHistory.id.desc())
+    ).label("rn")
+
+    ranked = select(
+        RiskHistory.water_source_id,
+        RiskHistory.risk_score,
+        previous,
+        rn
+    )
+    if organization_id is not None:
+        ranked = ranked.where(RiskHistory.organization_id == organization_id)
+    if source_ids is not None:
+        ranked = ranked.where(RiskHistory.water_source_id.in_(source_ids))
+    ranked = ranked.subquery()
+
+    delta = ranked.c.risk_score - ranked.c.previous
+    trend = case(
+        (ranked.c.previous == None, literal("stable")),
+        (delta > TREND_DELTA, literal("rising")),
+        (delta < -TREND_DELTA, literal("falling")),
+        else_=literal("stable")
+    ).label("trend")
+
+    stmt = select(
+        ranked.c.water_source_id,
+        ranked.c.risk_score,
+        trend
+    ).where(ranked.c.rn == 1)
+
+    return db.execute(stmt).all()
+
+
+def load_trends(db: Session, organization_id=None, source_ids=None) -> dict:
+    """
+    {source_id: "rising" | "falling" | "stable"} for a whole organization
+    (or the given sources), compatible with calculate_trend
+    """
+    return {
+        row.water_source_id: row.trend
+        for row in load_trend_rows(db, organization_id, source_ids)
+    }
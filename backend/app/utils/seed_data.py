@@ -3,8 +3,8 @@ from app.models.organization import Organization
 from app.models.user import User
 from app.models.membership import Membership
 from app.models.water_source import WaterSource
-from app.models.risk_history import RiskHistory
 from app.services.risk_engine import calculate_risk
+from app.services.risk_state import record_risk
 from app.services.auth import hash_password
 
 
@@ -55,13 +55,7 @@ def seed():
 
         # 5) Initial risk history row (tracks risk_score)
         initial_risk = calculate_risk(rainfall, water_level)
-        db.add(
-            RiskHistory(
-                water_source_id=source.id,
-                organization_id=org.id,
-                risk_score=initial_risk,
-            )
-        )
+        record_risk(db, source.id, org.id, initial_risk, trend="stable")
         db.commit()
 
         print("Database seeded successfully")
@@ -0,0 +1,46 @@
+"""
+Standalone background worker: runs the scheduled jobs from
+app.core.scheduler outside the API process.
+
+    python -m app.worker
+
+Start the API with RUN_SCHEDULER_IN_API=false when using it. Several
+worker replicas are safe, the DB leader lease lets only one run jobs.
+"""
+import signal
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from app.core.scheduler import register_jobs, stop_scheduler
+from app.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def _handle_stop(signum, frame):
+    """
+    SIGTERM/SIGINT: stop the scheduler (start() returns) and release the
+    lease right away, so a restarted or other worker can lead without
+    waiting for the TTL
+    """
+    logger.info(f"Worker received {signal.Signals(signum).name}, stopping")
+    stop_scheduler()
+
+
+def main():
+    scheduler = register_jobs(BlockingScheduler())
+    signal.signal(signal.SIGTERM, _handle_stop)
+    signal.signal(signal.SIGINT, _handle_stop)
+    logger.info("Worker started")
+
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        stop_scheduler()
+        logger.info("Worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,12 @@ from app.core.database import Base
 from app.models.water_source import WaterSource
 from app.models.risk_history import RiskHistory
 from app.models.organization import Organization 
+from app.models.recalculation_run import RecalculationRun
+from app.models.scheduler_lease import SchedulerLease
+from app.models.risk_rule_set import RiskRuleSet
+from app.models.source_risk_state import SourceRiskState
+from app.models.forecast_model import ForecastModel
+from app.models.risk_rollup import RiskRollup
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,36 @@
+"""add running regression sums to source_risk_states
+
+Revision ID: 0b8d2f4a6c71
+Revises: f3b5d7e9a142
+Create Date: 2026-10-18 16:41:27.305518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b8d2f4a6c71'
+down_revision = 'f3b5d7e9a142'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ("reg_w", "reg_sx", "reg_sy", "reg_sxy", "reg_sxx")
+
+
+def upgrade() -> None:
+    op.add_column(
+        "source_risk_states",
+        sa.Column("reg_n", sa.Integer(), nullable=False, server_default="0")
+    )
+    for name in COLUMNS:
+        op.add_column(
+            "source_risk_states",
+            sa.Column(name, sa.Float(), nullable=False, server_default="0")
+        )
+
+
+def downgrade() -> None:
+    for name in reversed(COLUMNS):
+        op.drop_column("source_risk_states", name)
+    op.drop_column("source_risk_states", "reg_n")
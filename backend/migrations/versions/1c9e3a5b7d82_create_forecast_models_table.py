@@ -0,0 +1,39 @@
+"""create forecast_models table
+
+Revision ID: 1c9e3a5b7d82
+Revises: 0b8d2f4a6c71
+Create Date: 2026-10-18 17:20:43.118260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c9e3a5b7d82'
+down_revision = '0b8d2f4a6c71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "forecast_models",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("version", sa.String(length=40), nullable=False),
+        sa.Column("kind", sa.String(length=30), nullable=False),
+        sa.Column("path", sa.String(length=255), nullable=False),
+        sa.Column("sources", sa.Integer(), nullable=True),
+        sa.Column("params", sa.Text(), nullable=True),
+        sa.Column("metrics", sa.Text(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+
+        sa.UniqueConstraint("version", name="uq_forecast_models_version"),
+    )
+    op.create_index("ix_forecast_models_is_active", "forecast_models", ["is_active"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_forecast_models_is_active", table_name="forecast_models")
+    op.drop_table("forecast_models")
@@ -0,0 +1,30 @@
+"""add rolling statistics to source_risk_states
+
+Revision ID: 2d4f6b8a0c93
+Revises: 1c9e3a5b7d82
+Create Date: 2026-10-18 18:05:12.664920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d4f6b8a0c93'
+down_revision = '1c9e3a5b7d82'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ("ewma", "roll_mean", "roll_std", "roll_slope", "roll_min", "roll_max")
+
+
+def upgrade() -> None:
+    op.add_column("source_risk_states", sa.Column("roll_buffer", sa.LargeBinary(), nullable=True))
+    for name in COLUMNS:
+        op.add_column("source_risk_states", sa.Column(name, sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    for name in reversed(COLUMNS):
+        op.drop_column("source_risk_states", name)
+    op.drop_column("source_risk_states", "roll_buffer")
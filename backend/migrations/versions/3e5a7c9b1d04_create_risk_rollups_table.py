@@ -0,0 +1,47 @@
+"""create risk_rollups table
+
+Revision ID: 3e5a7c9b1d04
+Revises: 2d4f6b8a0c93
+Create Date: 2026-10-18 18:48:36.520713
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e5a7c9b1d04'
+down_revision = '2d4f6b8a0c93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "risk_rollups",
+        sa.Column("water_source_id", sa.Integer(), nullable=False),
+        sa.Column("granularity", sa.String(length=10), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+
+        sa.Column("readings", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("min_score", sa.Float(), nullable=True),
+        sa.Column("max_score", sa.Float(), nullable=True),
+        sa.Column("last_score", sa.Float(), nullable=True),
+        sa.Column("last_at", sa.DateTime(), nullable=True),
+
+        sa.PrimaryKeyConstraint("water_source_id", "granularity", "bucket_start"),
+        sa.ForeignKeyConstraint(
+            ["water_source_id"], ["water_sources.id"], name="fk_risk_rollups_water_source_id", ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["organization_id"], ["organizations.id"], name="fk_risk_rollups_organization_id"
+        ),
+    )
+    op.create_index("ix_risk_rollups_organization_id", "risk_rollups", ["organization_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_risk_rollups_organization_id", table_name="risk_rollups")
+    op.drop_table("risk_rollups")
@@ -0,0 +1,28 @@
+"""add risk_history source/recorded_at index
+
+Revision ID: 3f9c1d2a7b64
+Revises: 8ce25c428b17
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c1d2a7b64'
+down_revision = '8ce25c428b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # "last N scores per source" window queries in the batch scheduler
+    op.create_index(
+        "ix_risk_history_source_recorded",
+        "risk_history",
+        ["water_source_id", "recorded_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_risk_history_source_recorded", table_name="risk_history")
@@ -0,0 +1,30 @@
+"""add rolling window running sums to source_risk_states
+
+Revision ID: 4a6c8e0b2d15
+Revises: 3e5a7c9b1d04
+Create Date: 2026-10-18 10:40:21.305117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a6c8e0b2d15'
+down_revision = '3e5a7c9b1d04'
+branch_labels = None
+depends_on = None
+
+# NULL until a row is next written: RollingStats.from_row then recomputes
+# them from roll_buffer once
+COLUMNS = ("roll_sum", "roll_sum_sq", "roll_sum_xy")
+
+
+def upgrade() -> None:
+    for name in COLUMNS:
+        op.add_column("source_risk_states", sa.Column(name, sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    for name in reversed(COLUMNS):
+        op.drop_column("source_risk_states", name)
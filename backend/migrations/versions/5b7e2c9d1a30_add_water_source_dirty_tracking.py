@@ -0,0 +1,37 @@
+"""add water_source dirty tracking
+
+Revision ID: 5b7e2c9d1a30
+Revises: 3f9c1d2a7b64
+Create Date: 2026-10-18 10:02:11.530117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e2c9d1a30'
+down_revision = '3f9c1d2a7b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # existing rows start dirty so the first incremental run covers them
+    op.add_column(
+        "water_sources",
+        sa.Column("needs_recalculation", sa.Boolean(), server_default=sa.text("true"), nullable=False),
+    )
+    op.add_column(
+        "water_sources",
+        sa.Column("forecast_expires_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_water_sources_needs_recalculation", "water_sources", ["needs_recalculation"])
+    op.create_index("ix_water_sources_forecast_expires_at", "water_sources", ["forecast_expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_water_sources_forecast_expires_at", table_name="water_sources")
+    op.drop_index("ix_water_sources_needs_recalculation", table_name="water_sources")
+    op.drop_column("water_sources", "forecast_expires_at")
+    op.drop_column("water_sources", "needs_recalculation")
@@ -0,0 +1,36 @@
+"""create recalculation_runs table
+
+Revision ID: 9a1d4e6f2c85
+Revises: 5b7e2c9d1a30
+Create Date: 2026-10-18 10:41:53.207781
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a1d4e6f2c85'
+down_revision = '5b7e2c9d1a30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recalculation_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("status", sa.String(length=20), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("last_source_id", sa.Integer(), nullable=True),
+        sa.Column("sources_processed", sa.Integer(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("error", sa.String(length=255), nullable=True),
+    )
+    op.create_index("ix_recalculation_runs_status", "recalculation_runs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recalculation_runs_status", table_name="recalculation_runs")
+    op.drop_table("recalculation_runs")
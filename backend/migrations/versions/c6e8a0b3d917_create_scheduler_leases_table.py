@@ -0,0 +1,30 @@
+"""create scheduler_leases table
+
+Revision ID: c6e8a0b3d917
+Revises: 9a1d4e6f2c85
+Create Date: 2026-10-18 11:20:07.664390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e8a0b3d917'
+down_revision = '9a1d4e6f2c85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduler_leases",
+        sa.Column("name", sa.String(length=100), primary_key=True),
+        sa.Column("holder", sa.String(length=255), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("acquired_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("scheduler_leases")
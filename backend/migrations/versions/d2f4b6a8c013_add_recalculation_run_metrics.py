@@ -0,0 +1,29 @@
+"""add recalculation_runs mode and metrics
+
+Revision ID: d2f4b6a8c013
+Revises: c6e8a0b3d917
+Create Date: 2026-10-18 13:05:22.418056
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f4b6a8c013'
+down_revision = 'c6e8a0b3d917'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "recalculation_runs",
+        sa.Column("mode", sa.String(length=20), server_default="batch", nullable=True),
+    )
+    op.add_column("recalculation_runs", sa.Column("metrics", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("recalculation_runs", "metrics")
+    op.drop_column("recalculation_runs", "mode")
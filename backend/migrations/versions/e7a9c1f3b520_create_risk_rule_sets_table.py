@@ -0,0 +1,46 @@
+"""create risk_rule_sets table
+
+Revision ID: e7a9c1f3b520
+Revises: d2f4b6a8c013
+Create Date: 2026-10-18 14:37:45.902113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a9c1f3b520'
+down_revision = 'd2f4b6a8c013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "risk_rule_sets",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+
+        sa.Column("rainfall_threshold", sa.Float(), nullable=False),
+        sa.Column("rainfall_points", sa.Integer(), nullable=False),
+        sa.Column("water_level_threshold", sa.Float(), nullable=False),
+        sa.Column("water_level_points", sa.Integer(), nullable=False),
+        sa.Column("alert_medium", sa.Float(), nullable=False),
+        sa.Column("alert_high", sa.Float(), nullable=False),
+        sa.Column("alert_critical", sa.Float(), nullable=False),
+        sa.Column("status_moderate", sa.Float(), nullable=False),
+        sa.Column("status_high", sa.Float(), nullable=False),
+        sa.Column("status_critical", sa.Float(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+
+        sa.ForeignKeyConstraint(
+            ["organization_id"], ["organizations.id"], name="fk_risk_rule_sets_organization_id", ondelete="CASCADE"
+        ),
+        sa.UniqueConstraint("organization_id", name="uq_risk_rule_sets_organization_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("risk_rule_sets")
@@ -0,0 +1,46 @@
+"""create source_risk_states table
+
+Revision ID: f3b5d7e9a142
+Revises: e7a9c1f3b520
+Create Date: 2026-10-18 15:52:10.417306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b5d7e9a142'
+down_revision = 'e7a9c1f3b520'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "source_risk_states",
+        sa.Column("water_source_id", sa.Integer(), primary_key=True),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("risk_score", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=True),
+        sa.Column("trend", sa.String(length=20), nullable=True),
+        sa.Column("forecast", sa.Float(), nullable=True),
+        sa.Column("recorded_at", sa.DateTime(), nullable=True),
+
+        sa.ForeignKeyConstraint(
+            ["water_source_id"], ["water_sources.id"], name="fk_source_risk_states_water_source_id", ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["organization_id"], ["organizations.id"], name="fk_source_risk_states_organization_id"
+        ),
+    )
+    op.create_index(
+        "ix_source_risk_states_organization_id",
+        "source_risk_states",
+        ["organization_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_source_risk_states_organization_id", table_name="source_risk_states")
+    op.drop_table("source_risk_states")
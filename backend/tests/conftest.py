@@ -0,0 +1,62 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+# scratch SQLite database, set before app.core.database creates the engine
+# (spawned shard processes inherit it through the environment)
+_tmp = tempfile.mkdtemp(prefix="water-risk-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+
+import app.models  # noqa: E402,F401
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.organization import Organization  # noqa: E402
+from app.models.risk_history import RiskHistory  # noqa: E402
+from app.models.water_source import WaterSource  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def seed(db, organizations=2, sources=6, readings=10):
+    """
+    `sources` water sources spread over `organizations`, each with
+    `readings` hourly risk scores ending now. Commits.
+    """
+    now = datetime.utcnow()
+    for org_id in range(1, organizations + 1):
+        db.add(Organization(id=org_id, name=f"org{org_id}"))
+    db.flush()
+
+    for source_id in range(1, sources + 1):
+        org_id = (source_id - 1) % organizations + 1
+        db.add(WaterSource(
+            id=source_id,
+            name=f"source{source_id}",
+            latitude=0.0,
+            longitude=0.0,
+            rainfall=30.0 + source_id,
+            water_level=10.0 + source_id,
+            organization_id=org_id
+        ))
+    db.flush()
+
+    for source_id in range(1, sources + 1):
+        org_id = (source_id - 1) % organizations + 1
+        for i in range(readings):
+            db.add(RiskHistory(
+                water_source_id=source_id,
+                organization_id=org_id,
+                risk_score=(source_id * 7 + i * 13) % 101,
+                recorded_at=now - timedelta(hours=readings - i)
+            ))
+    db.commit()
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.core import scheduler
+from app.models.recalculation_run import RecalculationRun
+from app.models.source_risk_state import SourceRiskState
+from app.services.adaptive_scheduler import AdaptiveRiskScheduler
+
+from conftest import seed
+
+
+def add_state(db, source_id, risk, trend, forecast):
+    db.add(SourceRiskState(
+        water_source_id=source_id,
+        organization_id=(source_id - 1) % 2 + 1,
+        risk_score=risk,
+        trend=trend,
+        forecast=forecast,
+        recorded_at=datetime.utcnow()
+    ))
+
+
+def test_refresh_prioritises_by_stored_forecast(db):
+    seed(db, organizations=2, sources=4, readings=0)
+    add_state(db, 1, 20, "stable", 20.0)
+    add_state(db, 2, 20, "stable", 90.0)  # low now, forecast critical
+    add_state(db, 3, 50, "stable", None)
+    db.commit()  # source 4 was never scored
+
+    adaptive = AdaptiveRiskScheduler(budget_per_hour=3600 * 2, tick_seconds=1)
+    assert adaptive.refresh(db) == 4
+    assert adaptive.refresh(db) == 0  # already queued
+
+    assert adaptive.take_due() == [2, 3]
+
+
+def test_adaptive_rounds_are_recorded_in_the_ledger(db, monkeypatch):
+    seed(db, organizations=2, sources=4, readings=3)
+    monkeypatch.setattr(scheduler, "_adaptive", None)
+
+    outcomes = scheduler.evaluate_adaptive()
+
+    run = db.execute(select(RecalculationRun)).scalar_one()
+    assert (run.mode, run.status, run.sources_processed) == ("adaptive", "completed", len(outcomes))
+    assert run.metrics
+
+
+def test_failed_setup_releases_the_run_lock(db, monkeypatch):
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(scheduler, "_adaptive", None)
+    monkeypatch.setattr(scheduler, "SessionLocal", broken_session)
+
+    assert scheduler.evaluate_adaptive() is None
+    assert scheduler.recalculate_risks_batch() is None
+
+    # the lock is free again for the next run
+    assert scheduler._run_lock.acquire(blocking=False)
+    scheduler._run_lock.release()
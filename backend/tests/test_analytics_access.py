@@ -0,0 +1,30 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth.dependencies import get_current_context
+from app.main import app
+
+from conftest import seed
+
+
+@pytest.fixture
+def client(db):
+    seed(db, organizations=2, sources=4, readings=20)
+    app.dependency_overrides[get_current_context] = lambda: {"organization_id": 1}
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("path", ["/analytics/trends/{}", "/analytics/history/{}"])
+def test_source_history_is_scoped_to_the_caller_organization(client, path):
+    own, foreign = 1, 2  # sources alternate between organizations 1 and 2
+
+    assert client.get(path.format(own)).status_code == 200
+    assert client.get(path.format(foreign)).status_code == 404
+    assert client.get(path.format(999)).status_code == 404
+
+
+def test_history_requires_authentication(db):
+    assert TestClient(app).get("/analytics/history/1").status_code == 401
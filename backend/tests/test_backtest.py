@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from app.ml.backtest import BacktestModel, LastValueModel, backtest
+
+# errors of the last-value forecast, worked out by hand:
+#   a (12 points, split 6): origins 6..11 -> -2, 0, -3, 0, 0, 0
+#   b (5 points): too short, skipped
+#   c (8 points, split max(5, 4) = 5): origins 5..7 -> -4, 0, 5
+SERIES = {
+    1: np.array([1, 1, 1, 1, 1, 1, 3, 3, 6, 6, 6, 6], dtype=float),
+    2: np.array([7, 7, 7, 7, 7], dtype=float),
+    3: np.array([5, 5, 5, 5, 5, 9, 9, 4], dtype=float)
+}
+
+
+class RecordingModel(BacktestModel):
+    name = "recording"
+
+    def __init__(self):
+        self.trained = None
+        self.calls = []
+
+    def fit(self, train_series):
+        self.trained = {s: list(v) for s, v in train_series.items()}
+
+    def predict(self, source_id, history):
+        self.calls.append((source_id, len(history)))
+        return float(history[-1])
+
+
+def test_walk_forward_splits():
+    model = RecordingModel()
+    result = backtest(model, SERIES)
+
+    # fitted on the training prefixes only, short series left out
+    assert model.trained == {1: [1.0] * 6, 3: [5.0] * 5}
+    # then one forecast per later point, from all history before it
+    walk = [(1, n) for n in range(6, 12)] + [(3, n) for n in range(5, 8)]
+    assert model.calls[:len(walk)] == walk
+    assert (result["series"], result["forecasts"]) == (2, 9)
+
+
+def test_error_metrics():
+    result = backtest(LastValueModel(), SERIES)
+
+    assert result["forecasts"] == 9
+    assert result["mae"] == round(14 / 9, 3)
+    assert result["rmse"] == round(np.sqrt(54 / 9), 3)
+
+
+def test_max_origins_caps_each_series():
+    # a: -2, 0   c: -4, 0
+    result = backtest(LastValueModel(), SERIES, max_origins=2)
+
+    assert result["forecasts"] == 4
+    assert result["mae"] == 1.5
+    assert result["rmse"] == round(np.sqrt(5), 3)
+
+
+def test_model_contract():
+    with pytest.raises(TypeError):
+        BacktestModel()
+
+    class NoPredict(BacktestModel):
+        pass
+
+    with pytest.raises(TypeError):
+        NoPredict()
+
+    class Constant(BacktestModel):
+        def predict(self, source_id, history):
+            return 3.0
+
+    model = Constant()
+    assert model.fit({1: SERIES[1]}) is None
+    assert model.predict_batch([1, 3], [SERIES[1], SERIES[3]]) == [3.0, 3.0]
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from app.core.config import get_settings
+from app.ml import predictor
+from app.ml.artifacts import ForecastArtifact
+from app.ml.predictor import MIN_HISTORY, forecast_many, forecast_scores
+
+settings = get_settings()
+
+
+def mixed_series(seed=7):
+    rng = np.random.default_rng(seed)
+    lengths = [0, 1, MIN_HISTORY - 1, MIN_HISTORY, 12, 60, 300]
+    return [np.round(rng.uniform(0, 100, n)).tolist() for n in lengths]
+
+
+@pytest.mark.parametrize("decay", [1.0, 0.85])
+def test_forecast_many_matches_forecast_scores(decay, monkeypatch):
+    monkeypatch.setattr(settings, "forecast_decay", decay)
+    series = mixed_series()
+
+    batch = forecast_many(series)
+    single = [forecast_scores(s) for s in series]
+
+    assert len(batch) == len(series)
+    for got, expected in zip(batch, single):
+        if expected is None:
+            assert got is None  # too little history
+        else:
+            assert got == pytest.approx(expected, abs=1e-8)
+
+
+def test_flat_series_forecasts_its_level():
+    assert forecast_many([[40.0] * 10]) == [pytest.approx(40.0)]
+
+
+def test_forecast_many_of_nothing():
+    assert forecast_many([]) == []
+
+
+def test_artifact_falls_back_to_linear_below_its_order(monkeypatch):
+    order = 8
+    # untrained sources use the pooled coefficients: next = last score
+    pooled = np.zeros(order + 1)
+    pooled[-1] = 1.0
+    artifact = ForecastArtifact(
+        np.array([], dtype=np.int64), np.empty((0, order + 1)), pooled, order
+    )
+    monkeypatch.setattr(predictor, "trained_model", lambda: artifact)
+
+    short = [10.0, 20.0, 30.0, 40.0, 50.0]  # MIN_HISTORY <= len < order
+    long = [10.0] * 9 + [70.0]
+    series = [short, long, [1.0, 2.0]]
+
+    linear = forecast_scores(short)
+    assert linear == pytest.approx(60.0)
+    assert forecast_scores(short, source_id=1) == pytest.approx(linear)
+    assert forecast_scores(long, source_id=2) == pytest.approx(70.0)
+    assert forecast_many(series, source_ids=[1, 2, 3]) == [
+        pytest.approx(linear), pytest.approx(70.0), None
+    ]
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from app.services.downsampling import METHODS, lttb, minmax
+
+
+def spiky(n=5000, seed=5):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=np.int64) * 3600
+    y = 50 + 10 * np.sin(np.arange(n) / 200) + rng.normal(0, 1, n)
+    y[1234] = 100.0  # one short spike
+    y[3210] = 0.0  # one short dip
+    return x, y
+
+
+@pytest.mark.parametrize("method", sorted(METHODS))
+@pytest.mark.parametrize("max_points", [3, 4, 50, 500])
+def test_keeps_endpoints_and_stays_in_budget(method, max_points):
+    x, y = spiky()
+
+    idx = METHODS[method](x, y, max_points)
+
+    assert len(idx) <= max_points
+    assert idx[0] == 0 and idx[-1] == len(y) - 1
+    assert np.all(np.diff(idx) > 0)  # time order, no duplicates
+
+
+@pytest.mark.parametrize("method", sorted(METHODS))
+@pytest.mark.parametrize("max_points", [20, 500])
+def test_keeps_the_spike_and_the_dip(method, max_points):
+    x, y = spiky()
+
+    idx = METHODS[method](x, y, max_points)
+
+    assert 1234 in idx and 3210 in idx
+
+
+def test_minmax_keeps_the_peak_even_at_three_points():
+    x, y = spiky()
+    assert 1234 in minmax(x, y, 3)
+
+
+@pytest.mark.parametrize("method", [lttb, minmax])
+def test_short_series_is_returned_whole(method):
+    x, y = np.arange(10), np.arange(10.0)
+    assert method(x, y, 10).tolist() == list(range(10))
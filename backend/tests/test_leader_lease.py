@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.core.leader import LeaderLease
+from app.core.scheduler import skip_if_recently_run
+from app.models.recalculation_run import RecalculationRun
+from app.models.scheduler_lease import SchedulerLease
+
+
+def expire(db, name):
+    db.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name)
+        .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+    )
+    db.commit()
+
+
+def test_only_one_holder_while_the_lease_is_live(db):
+    first = LeaderLease("scheduler", ttl_seconds=60)
+    second = LeaderLease("scheduler", ttl_seconds=60)
+
+    assert first.renew()
+    assert not second.renew()
+    assert first.renew()  # the holder keeps renewing
+
+
+def test_expired_lease_is_taken_over(db):
+    first = LeaderLease("scheduler", ttl_seconds=60)
+    second = LeaderLease("scheduler", ttl_seconds=60)
+    assert first.renew()
+
+    expire(db, "scheduler")  # the leader stopped renewing
+
+    assert second.renew()
+    assert not first.renew()
+    assert (first.is_leader, second.is_leader) == (False, True)
+
+
+def test_released_lease_is_taken_over_immediately(db):
+    first = LeaderLease("scheduler", ttl_seconds=60)
+    second = LeaderLease("scheduler", ttl_seconds=60)
+    assert first.renew()
+
+    first.release()
+
+    assert second.renew()
+
+
+def test_guard_skips_jobs_on_followers(db):
+    leader = LeaderLease("scheduler", ttl_seconds=60)
+    follower = LeaderLease("scheduler", ttl_seconds=60)
+    assert leader.renew()
+
+    assert leader.guard(lambda: "ran")() == "ran"
+    assert follower.guard(lambda: "ran")() is None
+
+
+def add_run(db, hours_ago, status="completed", mode="batch"):
+    started_at = datetime.utcnow() - timedelta(hours=hours_ago)
+    db.add(RecalculationRun(
+        mode=mode,
+        status=status,
+        started_at=started_at,
+        finished_at=started_at + timedelta(minutes=10)
+    ))
+    db.commit()
+
+
+def test_new_leader_skips_a_run_the_old_leader_just_did(db):
+    calls = []
+    job = skip_if_recently_run(lambda: calls.append(1) or "ran")
+
+    add_run(db, hours_ago=0.2, mode="sharded")
+
+    assert job() is None
+    assert calls == []
+
+
+@pytest.mark.parametrize("hours_ago, status, mode", [
+    (23, "completed", "batch"),  # a day ago: due again
+    (0.2, "failed", "batch"),
+    (0.2, "completed", "adaptive")  # rounds don't replace a full pass
+])
+def test_job_runs_when_no_recent_full_run_completed(db, hours_ago, status, mode):
+    job = skip_if_recently_run(lambda: "ran")
+
+    add_run(db, hours_ago=hours_ago, status=status, mode=mode)
+
+    assert job() == "ran"
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.core.database import SessionLocal
+from app.ml.model import RegressionState, RiskForecastModel
+from app.models.source_risk_state import SourceRiskState
+from app.services.risk_state import advance_regression, load_states, record_risk, upsert_states
+
+from conftest import seed
+
+
+def series(length=120, seed=3):
+    rng = np.random.default_rng(seed)
+    return np.clip(50 + np.cumsum(rng.normal(0, 4, length)), 0, 100)
+
+
+@pytest.mark.parametrize("decay", [1.0, 0.9])
+def test_running_sums_match_a_full_refit(decay):
+    scores = series()
+    state = RegressionState()
+
+    for i, score in enumerate(scores, start=1):
+        state.update(score, decay)
+        if i < 2:
+            continue
+        refit = RiskForecastModel(decay=decay)
+        refit.train(scores[:i])
+        assert state.predict() == pytest.approx(refit.predict_next(), abs=1e-6)
+
+    assert state.n == len(scores)
+
+
+def test_round_trips_through_a_state_row():
+    state = RegressionState()
+    for score in series(30):
+        state.update(score)
+
+    row = SourceRiskState(**state.as_columns())
+    restored = RegressionState.from_row(row)
+
+    assert restored.as_columns() == state.as_columns()
+    assert restored.predict() == state.predict()
+
+
+def test_concurrent_writers_do_not_lose_observations(db):
+    seed(db, organizations=1, sources=1, readings=0)
+    record_risk(db, 1, 1, 40)
+    db.commit()
+
+    # writer A holds the state it read while writer B records a score
+    previous = load_states(db, [1], for_update=True)[1]
+    writer_b = threading.Thread(target=lambda: _record(1, 60))
+    writer_b.start()
+    time.sleep(0.3)
+
+    upsert_states(db, [{
+        "water_source_id": 1,
+        "organization_id": 1,
+        **advance_regression(previous, 50).as_columns()
+    }])
+    db.commit()
+    writer_b.join()
+
+    db.expire_all()
+    assert db.get(SourceRiskState, 1).reg_n == 3
+
+
+def _record(source_id, score):
+    db = SessionLocal()
+    try:
+        record_risk(db, source_id, 1, score)
+        db.commit()
+    finally:
+        db.close()
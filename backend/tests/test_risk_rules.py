@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.auth.dependencies import get_current_context
+from app.main import app
+from app.models.organization import Organization
+from app.models.risk_rule_set import RiskRuleSet
+from app.models.source_risk_state import SourceRiskState
+from app.services.adaptive_scheduler import EVALUATION_INTERVALS, evaluation_interval
+from app.services.alerts import evaluate_alert
+from app.services.risk_rules import CompiledRiskRules, invalidate_rules
+
+STRICT = CompiledRiskRules(alert_bins=(20, 30, 50), status_bins=(10, 20, 30))
+
+
+def test_alert_gate_follows_the_organization_thresholds():
+    assert not evaluate_alert(35)  # defaults: medium from 40
+    assert evaluate_alert(35, STRICT)
+    assert not evaluate_alert(15, STRICT)
+
+
+def test_adaptive_interval_uses_the_organization_status():
+    assert evaluation_interval(35, "stable") == EVALUATION_INTERVALS["moderate"]
+    assert evaluation_interval(35, "stable", rules=STRICT) == EVALUATION_INTERVALS["critical"]
+
+
+def test_new_source_is_scored_with_its_organization_rules(db):
+    db.add(Organization(id=1, name="org1"))
+    db.add(RiskRuleSet(
+        organization_id=1,
+        rainfall_threshold=80,
+        rainfall_points=25,
+        water_level_threshold=5,
+        water_level_points=60,
+        status_moderate=10,
+        status_high=30,
+        status_critical=90
+    ))
+    db.commit()
+    invalidate_rules()
+
+    app.dependency_overrides[get_current_context] = lambda: {"organization_id": 1}
+    try:
+        response = TestClient(app).post("/water-sources/", json={
+            "name": "well",
+            "latitude": 0,
+            "longitude": 0,
+            "water_level": 10,
+            "rainfall": 60
+        })
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    state = db.execute(select(SourceRiskState)).scalar_one()
+    # the default rules would give 60 / high
+    assert (state.organization_id, state.risk_score, state.status) == (1, 25, "moderate")
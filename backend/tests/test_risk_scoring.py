@@ -0,0 +1,43 @@
+import numpy as np
+
+from app.services.risk_engine import calculate_risk, calculate_risk_batch
+from app.services.risk_rules import CompiledRiskRules
+
+
+def grid():
+    # values on both sides of, and exactly at, every default threshold
+    rainfall = [0.0, 49.99, 50.0, 50.01, 120.0]
+    water_level = [0.0, 19.99, 20.0, 20.01, 45.0]
+    pairs = [(r, w) for r in rainfall for w in water_level]
+    return [p[0] for p in pairs], [p[1] for p in pairs]
+
+
+def test_batch_matches_scalar_with_default_rules():
+    rainfall, water_level = grid()
+
+    batch = calculate_risk_batch(rainfall, water_level)
+
+    assert batch.tolist() == [calculate_risk(r, w) for r, w in zip(rainfall, water_level)]
+
+
+def test_batch_matches_scalar_with_organization_rules():
+    rules = CompiledRiskRules(
+        rainfall_threshold=30.0,
+        rainfall_points=70,
+        water_level_threshold=25.0,
+        water_level_points=50
+    )
+    rng = np.random.default_rng(0)
+    rainfall = rng.uniform(0, 100, 500)
+    water_level = rng.uniform(0, 50, 500)
+
+    batch = calculate_risk_batch(rainfall, water_level, rules)
+
+    assert batch.tolist() == [
+        calculate_risk(r, w, rules) for r, w in zip(rainfall, water_level)
+    ]
+    assert batch.max() == 100  # capped
+
+
+def test_batch_of_nothing():
+    assert calculate_risk_batch([], []).tolist() == []
@@ -0,0 +1,55 @@
+import asyncio
+
+from app.models.source_risk_state import SourceRiskState
+from app.models.water_source import WaterSource
+from app.services import risk_engine
+from app.services.dashboard_builder import source_forecast
+
+from conftest import seed
+
+ROW_FIELDS = {"id", "name", "risk_score", "trend", "forecast", "status", "stats"}
+
+
+async def _update(source, score):
+    # what the app's startup does
+    risk_engine.start_risk_updates()
+    await risk_engine.update_risk(source, score)
+
+
+def test_every_risk_update_carries_a_full_row(db, monkeypatch):
+    seed(db, organizations=1, sources=1, readings=6)
+    sent = []
+
+    async def capture(source_id, payload):
+        sent.append(payload)
+
+    monkeypatch.setattr(risk_engine, "broadcast_risk_update", capture)
+    source = db.get(WaterSource, 1)
+
+    asyncio.run(_update(source, 90))
+
+    # clients replace the source with each payload: none may be partial
+    assert len(sent) == 2
+    for payload in sent:
+        assert ROW_FIELDS <= set(payload)
+        assert (payload["id"], payload["name"], payload["risk_score"]) == (1, "source1", 90)
+    assert "explanation" in sent[-1]
+
+
+def test_stored_forecast_is_unrounded(db, monkeypatch):
+    seed(db, organizations=1, sources=1, readings=6)
+    sent = []
+
+    async def capture(source_id, payload):
+        sent.append(payload)
+
+    monkeypatch.setattr(risk_engine, "broadcast_risk_update", capture)
+
+    asyncio.run(_update(db.get(WaterSource, 1), 77))
+
+    db.expire_all()
+    state = db.get(SourceRiskState, 1)
+    assert state.risk_score == 77
+    assert state.forecast == source_forecast(db, 1)
+    # rounding is for display only, and the first broadcast is already fresh
+    assert sent[0]["forecast"] == round(state.forecast, 1)
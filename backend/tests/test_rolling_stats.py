@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from app.models.source_risk_state import SourceRiskState
+from app.services.rolling_stats import RollingStats
+from app.services.trends import calculate_trend
+
+WINDOW = 8
+
+
+def scores(length=60, seed=11):
+    rng = np.random.default_rng(seed)
+    return np.round(rng.uniform(0, 100, length))
+
+
+def recompute(window):
+    x = np.arange(len(window), dtype=float)
+    slope = np.polyfit(x, window, 1)[0] if len(window) > 1 else 0.0
+    return {
+        "mean": window.mean(),
+        "std": window.std(),
+        "slope": slope,
+        "min": window.min(),
+        "max": window.max()
+    }
+
+
+def assert_matches(stats, window):
+    expected = recompute(window)
+    assert stats.values().tolist() == window.tolist()
+    for name, value in expected.items():
+        assert getattr(stats, name) == pytest.approx(value, abs=1e-6), name
+
+
+def test_updates_match_a_full_recompute_of_the_window():
+    values = scores()
+    stats = RollingStats(window=WINDOW, alpha=0.3)
+    ewma = None
+
+    for i, score in enumerate(values):
+        stats.update(score)
+        ewma = score if ewma is None else 0.3 * score + 0.7 * ewma
+        window = values[max(0, i + 1 - WINDOW):i + 1]
+
+        assert_matches(stats, window)
+        assert stats.ewma == pytest.approx(ewma)
+        assert stats.trend() == calculate_trend(window[-3:].tolist())
+
+
+@pytest.mark.parametrize("seen", [1, 3, WINDOW, 25])
+def test_restored_state_continues_like_the_original(seen, monkeypatch):
+    monkeypatch.setattr("app.services.rolling_stats.settings.rolling_window", WINDOW)
+    values = scores(seen + 20)
+
+    original = RollingStats(window=WINDOW)
+    for score in values[:seen]:
+        original.update(score)
+    restored = RollingStats.from_row(SourceRiskState(**original.as_columns()))
+
+    # loaded from the persisted sums, not by replaying the buffer
+    assert (restored.total, restored.total_sq, restored.sxy) == (
+        original.total, original.total_sq, original.sxy
+    )
+    for score in values[seen:]:
+        original.update(score)
+        restored.update(score)
+        assert restored.summary() == pytest.approx(original.summary())
+        assert restored.values().tolist() == original.values().tolist()
+
+
+def test_rows_without_persisted_sums_are_recomputed(monkeypatch):
+    monkeypatch.setattr("app.services.rolling_stats.settings.rolling_window", WINDOW)
+    original = RollingStats(window=WINDOW, values=scores(12))
+    columns = {**original.as_columns(), "roll_sum": None, "roll_sum_sq": None, "roll_sum_xy": None}
+
+    restored = RollingStats.from_row(SourceRiskState(**columns))
+
+    assert restored.summary() == pytest.approx(original.summary())
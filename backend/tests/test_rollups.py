@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.auth.dependencies import get_current_context
+from app.main import app
+from app.models.risk_rollup import RiskRollup
+from app.scripts.backfill_rollups import backfill
+from app.services.rollups import choose_granularity, first_reading_at, record_rollups
+
+from conftest import seed
+
+END = datetime(2026, 6, 15, 12, 30)
+
+
+@pytest.mark.parametrize("span, max_points, resolution, expected", [
+    (timedelta(hours=10), 500, None, None),  # raw readings show more
+    (timedelta(days=60), 500, None, "day"),  # 1441 hours, 61 days
+    (timedelta(days=5 * 365), 500, None, "month"),
+    (timedelta(days=100 * 365), 100, None, "month"),  # nothing fits
+    (timedelta(days=3), 500, 86400, "hour"),  # finest under the cap
+    (timedelta(days=60), 500, 3600, "hour"),  # too many: downsampled
+    (timedelta(days=60), 500, 60, None)
+])
+def test_choose_granularity(span, max_points, resolution, expected):
+    assert choose_granularity(END - span, END, max_points, resolution) == expected
+
+
+def _rollups(db):
+    db.expire_all()
+    return [
+        (r.water_source_id, r.granularity, r.bucket_start, r.readings,
+         r.total, r.min_score, r.max_score, r.last_score, r.last_at)
+        for r in db.execute(
+            select(RiskRollup).order_by(
+                RiskRollup.water_source_id,
+                RiskRollup.granularity,
+                RiskRollup.bucket_start
+            )
+        ).scalars()
+    ]
+
+
+def test_merge_adds_into_existing_buckets(db):
+    seed(db, organizations=1, sources=1, readings=0)
+
+    def reading(score, minute):
+        return {
+            "water_source_id": 1,
+            "organization_id": 1,
+            "risk_score": score,
+            "recorded_at": END.replace(minute=minute)
+        }
+
+    record_rollups(db, [reading(40, 10), reading(70, 20)])
+    record_rollups(db, [reading(55, 50), reading(20, 5)])  # one late reading
+    db.commit()
+
+    rows = _rollups(db)
+    assert [r[1] for r in rows] == ["day", "hour", "month"]
+    for row in rows:
+        assert row[3:] == (4, 185.0, 20.0, 70.0, 55.0, END.replace(minute=50))
+
+
+def test_backfill_is_idempotent(db, capsys):
+    seed(db, organizations=2, sources=3, readings=30)
+
+    backfill(chunk_size=2)
+    first = _rollups(db)
+    backfill(chunk_size=2)
+
+    assert _rollups(db) == first
+    hours = [r for r in first if r[1] == "hour"]
+    assert sum(r[3] for r in hours) == 3 * 30
+    assert "for 3 sources" in capsys.readouterr().out
+
+
+def test_first_reading_falls_back_to_history(db):
+    seed(db, organizations=1, sources=1, readings=5)
+    from_history = first_reading_at(db, 1)
+
+    backfill()
+    from_rollups = first_reading_at(db, 1)
+
+    assert from_rollups == from_history.replace(minute=0, second=0, microsecond=0)
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_context] = lambda: {"organization_id": 1}
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_history_keeps_to_max_points(db, client):
+    seed(db, organizations=1, sources=1, readings=600)
+    backfill()
+
+    hourly = client.get("/analytics/history/1", params={
+        "max_points": 11,
+        "resolution": 3600
+    }).json()
+    raw = client.get("/analytics/history/1", params={
+        "start": (datetime.utcnow() - timedelta(hours=5)).isoformat()
+    }).json()
+
+    assert hourly["granularity"] == "hour"
+    assert 3 <= len(hourly["buckets"]) <= 11
+    assert raw["granularity"] == "raw"
+    # one timestamp format whichever table the buckets come from
+    for bucket in hourly["buckets"] + raw["buckets"]:
+        assert isinstance(datetime.fromisoformat(bucket["start"]), datetime)
@@ -0,0 +1,61 @@
+from sqlalchemy import func, select
+
+from app.core import scheduler
+from app.core.config import get_settings
+from app.models.recalculation_run import RecalculationRun
+from app.models.risk_history import RiskHistory
+
+from conftest import seed
+
+settings = get_settings()
+
+
+def history_counts(db):
+    rows = db.execute(
+        select(RiskHistory.water_source_id, func.count(RiskHistory.id))
+        .group_by(RiskHistory.water_source_id)
+    )
+    return dict(rows.all())
+
+
+def test_interrupted_run_resumes_after_its_checkpoint(db, monkeypatch):
+    seed(db, organizations=1, sources=6, readings=3)
+    monkeypatch.setattr(settings, "recalc_chunk_size", 2)
+
+    real_batch = scheduler.recalculate_batch
+
+    def failing_batch(chunk_db, sources, **kwargs):
+        if sources[0].id == 3:
+            raise RuntimeError("worker died")
+        return real_batch(chunk_db, sources, **kwargs)
+
+    monkeypatch.setattr(scheduler, "recalculate_batch", failing_batch)
+    assert scheduler.recalculate_risks_batch() is None
+
+    run = db.execute(select(RecalculationRun)).scalar_one()
+    assert (run.status, run.last_source_id, run.sources_processed) == ("failed", 2, 2)
+    # the first chunk committed with its checkpoint, the failed one rolled back
+    assert history_counts(db) == {1: 4, 2: 4, 3: 3, 4: 3, 5: 3, 6: 3}
+
+    monkeypatch.setattr(scheduler, "recalculate_batch", real_batch)
+    summary = scheduler.recalculate_risks_batch()
+
+    assert summary["sources"] == 4
+    db.expire_all()
+    run = db.execute(select(RecalculationRun)).scalar_one()
+    assert (run.status, run.attempts, run.last_source_id, run.sources_processed) == (
+        "completed", 2, 6, 6
+    )
+    # every source recalculated exactly once across both attempts
+    assert history_counts(db) == {source_id: 4 for source_id in range(1, 7)}
+
+
+def test_completed_run_is_not_resumed(db):
+    seed(db, organizations=1, sources=2, readings=3)
+
+    scheduler.recalculate_risks_batch()
+    scheduler.recalculate_risks_batch()
+
+    runs = db.execute(select(RecalculationRun).order_by(RecalculationRun.id)).scalars().all()
+    assert [(r.status, r.attempts) for r in runs] == [("completed", 1), ("completed", 1)]
+    assert history_counts(db) == {1: 5, 2: 5}
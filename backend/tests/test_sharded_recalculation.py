@@ -0,0 +1,28 @@
+from sqlalchemy import func, select
+
+from app.core.scheduler import partition_organizations, recalculate_risks_sharded
+from app.models.recalculation_run import RecalculationRun
+from app.models.risk_history import RiskHistory
+
+from conftest import seed
+
+
+def test_partition_organizations_balances_sources():
+    shards = partition_organizations([(1, 10), (2, 6), (3, 4), (4, 1)], 2)
+
+    assert sorted(org for shard in shards for org in shard) == [1, 2, 3, 4]
+    assert len(shards) == 2
+
+
+def test_sharded_run_recalculates_in_spawned_processes(db):
+    seed(db, organizations=2, sources=6, readings=5)
+
+    results = recalculate_risks_sharded(workers=2)
+
+    # every shard process ran (a failed shard is logged and left out)
+    assert len(results) == 2
+    assert sum(r["sources"] for r in results) == 6
+    assert db.execute(select(func.count(RiskHistory.id))).scalar() == 6 * 6
+
+    run = db.execute(select(RecalculationRun)).scalar_one()
+    assert (run.mode, run.status, run.sources_processed) == ("sharded", "completed", 6)